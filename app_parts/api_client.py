@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_BASE_URL = "https://summitlogicapidb-production.up.railway.app/api"
+
+# (connect, read) timeouts in seconds, per endpoint path relative to the base URL
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    'auth/login': (3.05, 8),
+    'auth/register': (3.05, 10),
+    'flights': (3.05, 10),
+    'scanner': (3.05, 5),
+    'scanner/batch': (3.05, 10),
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling an endpoint whose circuit breaker is open.
+
+    Subclasses ``ConnectionError`` so callers' existing offline fallbacks
+    apply unchanged.
+    """
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"Circuit open for '{endpoint}', retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one endpoint.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast for ``cooldown`` seconds; then a single probe request is
+    let through and its outcome closes or re-opens the breaker. State
+    changes are logged with the breaker's ``name``.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, cooldown=30.0, name='api'):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.retry_in() <= 0:
+                self.state = self.HALF_OPEN
+                print(f"[DEBUG] Circuit for '{self.name}' half-open; sending a probe request")
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"[SUCCESS] Circuit for '{self.name}' closed; API reachable again")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[WARNING] Circuit for '{self.name}' opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures, 'retry_in': self.retry_in() if self.state != self.CLOSED else 0.0}
+
+
+class ApiClient:
+    """Client for the SummitLogic backend shared by every page and session.
+
+    Keeps one pooled keep-alive ``requests.Session`` so calls stop paying
+    TCP+TLS setup, applies per-endpoint connect/read timeouts and records
+    request timings per endpoint. Each endpoint has its own circuit breaker
+    so a dead backend costs one timeout, not one per rerun.
+    """
+
+    def __init__(self, base_url=None, timeouts=None, pool_size=20, failure_threshold=3, cooldown=30.0):
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._breakers = {}
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def endpoint_path(self, path_or_url):
+        """Return the endpoint path relative to the base URL."""
+        if path_or_url.startswith(self.base_url):
+            path_or_url = path_or_url[len(self.base_url):]
+        return path_or_url.split('?', 1)[0].strip('/')
+
+    def url(self, path_or_url):
+        if path_or_url.startswith(('http://', 'https://')):
+            return path_or_url
+        return f"{self.base_url}/{path_or_url.lstrip('/')}"
+
+    def timeout_for(self, path_or_url):
+        return self.timeouts.get(self.endpoint_path(path_or_url), DEFAULT_TIMEOUT)
+
+    def breaker(self, path_or_url):
+        endpoint = self.endpoint_path(path_or_url)
+        with self._metrics_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.cooldown, endpoint)
+            return breaker
+
+    def request(self, method, path_or_url, **kwargs):
+        """Send a request through the pooled session.
+
+        Raises requests exceptions like ``requests.request``, and
+        ``CircuitOpenError`` without touching the network while the
+        endpoint's breaker is open. 5xx responses and connection errors count
+        as breaker failures; 4xx responses mean the server is up.
+        """
+        endpoint = self.endpoint_path(path_or_url)
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            self._record(endpoint, 0.0, True, short_circuited=True)
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+        kwargs.setdefault('timeout', self.timeout_for(path_or_url))
+        start = time.perf_counter()
+        error = True
+        try:
+            response = self.session.request(method, self.url(path_or_url), **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            if error:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self._record(endpoint, (time.perf_counter() - start) * 1000.0, error)
+
+    def get(self, path_or_url, **kwargs):
+        return self.request('GET', path_or_url, **kwargs)
+
+    def post(self, path_or_url, **kwargs):
+        return self.request('POST', path_or_url, **kwargs)
+
+    def _record(self, endpoint, elapsed_ms, error, short_circuited=False):
+        with self._metrics_lock:
+            m = self._metrics.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'short_circuited': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0,
+            })
+            if short_circuited:
+                m['short_circuited'] += 1
+                return
+            m['count'] += 1
+            m['errors'] += int(error)
+            m['total_ms'] += elapsed_ms
+            m['max_ms'] = max(m['max_ms'], elapsed_ms)
+            m['last_ms'] = elapsed_ms
+
+    def metrics(self):
+        """Per-endpoint request/error/short-circuit counts, latency (avg/max/last, ms) and breaker snapshot."""
+        with self._metrics_lock:
+            items = list(self._metrics.items())
+            breakers = dict(self._breakers)
+        out = {}
+        for endpoint, m in items:
+            out[endpoint] = dict(m, avg_ms=m['total_ms'] / m['count'] if m['count'] else 0.0)
+            if endpoint in breakers:
+                out[endpoint]['breaker'] = breakers[endpoint].snapshot()
+        return out
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """Return the process-wide API client.
+
+    Configured from ``API_BASE_URL``, ``API_BREAKER_FAILURES`` and
+    ``API_BREAKER_COOLDOWN`` (seconds).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ApiClient(
+                    os.environ.get('API_BASE_URL'),
+                    failure_threshold=int(os.environ.get('API_BREAKER_FAILURES', 3)),
+                    cooldown=float(os.environ.get('API_BREAKER_COOLDOWN', 30)),
+                )
+    return _client
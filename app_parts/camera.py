@@ -0,0 +1,114 @@
+import threading
+import time
+
+from .frame_sources import open_source
+
+
+class FrameGrabber:
+    """Capture frames on a background thread, keeping only the newest one.
+
+    The scan loop calls ``read()`` and always gets the most recent frame;
+    frames captured while it was busy decoding are dropped instead of piling
+    up in the driver buffer. Mirrors the ``cv2.VideoCapture`` methods the
+    scanners use (``isOpened``/``read``/``release``). ``source`` is any
+    ``open_source`` spec: a device index, a video file, an image folder or a
+    synthetic QR generator.
+    """
+
+    def __init__(self, source=0, width=640, height=480, fps=30):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._last_read_seq = 0
+        self._failed = False
+
+    def start(self):
+        """Open the source and start the capture thread. Returns False if it could not be opened."""
+        try:
+            self._cap = open_source(self.source, self.width, self.height, self.fps)
+        except Exception as e:
+            print(f"[ERROR] Could not open frame source {self.source!r}: {e}")
+            return False
+        if not self._cap.isOpened():
+            self._cap.release()
+            self._cap = None
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+        self._thread.start()
+        return True
+
+    @property
+    def failed(self):
+        """True once the source stopped delivering frames."""
+        return self._failed
+
+    def isOpened(self):
+        return self._cap is not None and self._running and not self._failed
+
+    def _run(self):
+        # The thread owns the capture: it is released here, never while a read is in flight
+        cap = self._cap
+        failures = 0
+        try:
+            while self._running:
+                ok, frame = cap.read()
+                if not ok:
+                    failures += 1
+                    if failures >= 30:
+                        print("[ERROR] Camera stopped delivering frames")
+                        with self._cond:
+                            self._failed = True
+                            self._running = False
+                            self._cond.notify_all()
+                        break
+                    time.sleep(0.01)
+                    continue
+                failures = 0
+                with self._cond:
+                    if self._seq > self._last_read_seq:
+                        # Previous frame was never consumed
+                        self.frames_dropped += 1
+                    self._frame = frame
+                    self._seq += 1
+                    self.frames_captured += 1
+                    self._cond.notify_all()
+        finally:
+            cap.release()
+
+    def read(self, timeout=1.0):
+        """Return ``(ok, frame)`` with the newest frame not yet returned.
+
+        Blocks up to ``timeout`` seconds for a fresh frame.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._seq > self._last_read_seq or self._failed or not self._running,
+                timeout=timeout,
+            )
+            if not ready or self._seq <= self._last_read_seq:
+                return False, None
+            self._last_read_seq = self._seq
+            return True, self._frame
+
+    def release(self):
+        """Stop capturing. The capture thread releases the source once its current read returns."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                print(f"[WARNING] Frame source {self.source!r} still reading; it is released when the read returns")
+            self._thread = None
+        self._cap = None
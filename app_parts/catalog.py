@@ -0,0 +1,279 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+
+ALCOHOL_KEYWORDS = ['Wine', 'Beer', 'Whiskey', 'Tequila', 'Rum', 'Vodka', 'Gin', 'Brandy', 'Cognac', 'Champagne']
+
+
+# Characters that may follow a catalog URL embedded in a longer payload
+URL_BOUNDARY = '?#/'
+
+
+def _trailing_id(url):
+    return url.split('/')[-1]
+
+
+class _UrlMatcher:
+    """Aho-Corasick automaton over catalog URLs.
+
+    Finds every catalog URL contained in a payload with a single pass over
+    the payload, instead of testing each URL with ``in``.
+    """
+
+    def __init__(self, patterns):
+        # patterns: iterable of (url, position) — position is the catalog row
+        # order, used to return the same row the old linear scan returned.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        for url, pos in patterns:
+            if not url:
+                continue
+            node = 0
+            for ch in url:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                node = nxt
+            if self._out[node] is None or pos < self._out[node]:
+                self._out[node] = pos
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        # Breadth-first so a node's failure target is finalised before its
+        # children are visited. `_best` folds in the outputs reachable
+        # through failure links so the search never has to follow them.
+        self._best = list(self._out)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None or inherited < self._best[child]):
+                    self._best[child] = inherited
+
+    def first_match(self, text):
+        """Return the lowest catalog position whose URL occurs in ``text``.
+
+        A URL only counts when it ends the payload or is followed by one of
+        ``URL_BOUNDARY``, so ``.../posts/2`` does not match ``.../posts/25``.
+        """
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        found = None
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = best[node]
+            if hit is not None and (found is None or hit < found) and (i == last or text[i + 1] in URL_BOUNDARY):
+                found = hit
+        return found
+
+
+class CatalogIndex:
+    """Prebuilt lookup tables for resolving QR payloads against a catalog.
+
+    Resolution mirrors the scanners' original strategy, in order:
+    exact URL match, catalog URL contained in the payload, then trailing ID.
+    """
+
+    def __init__(self, df):
+        self.rows = []
+        self.by_url = {}
+        self.by_id = {}
+        if df is not None and not df.empty and 'url' in df.columns:
+            names = df['name'] if 'name' in df.columns else [None] * len(df)
+            for name, url in zip(names, df['url']):
+                if pd.isna(url):
+                    continue
+                url = str(url)
+                pos = len(self.rows)
+                row = {'name': name, 'url': url}
+                self.rows.append(row)
+                self.by_url.setdefault(url, pos)
+                self.by_id.setdefault(_trailing_id(url), pos)
+        self._matcher = _UrlMatcher((row['url'], pos) for pos, row in enumerate(self.rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def exact(self, url):
+        """Return the row whose URL equals ``url`` exactly, or None."""
+        pos = self.by_url.get(url)
+        return self.rows[pos] if pos is not None else None
+
+    def resolve(self, qr_data_clean):
+        """Resolve a stripped QR payload to ``(row, item_id)`` or ``(None, None)``."""
+        pos = self.by_url.get(qr_data_clean)
+        if pos is not None:
+            return self.rows[pos], _trailing_id(qr_data_clean)
+
+        # Catalog URL embedded in the payload (e.g. extra query parameters)
+        pos = self._matcher.first_match(qr_data_clean)
+        if pos is not None:
+            row = self.rows[pos]
+            return row, _trailing_id(row['url'])
+
+        qr_id = _trailing_id(qr_data_clean)
+        pos = self.by_id.get(qr_id) if qr_id else None
+        if pos is not None:
+            return self.rows[pos], qr_id
+
+        return None, None
+
+
+class LookupMemo:
+    """Bounded LRU memo of QR payload -> ``(item, error)`` lookup result.
+
+    Lives on a ``Catalog`` snapshot, so a catalog reload starts from an
+    empty memo. Shared by annotation and ``process_qr`` (and by every
+    session), which otherwise resolve the same payload several times per
+    frame. Results are shared too: callers must not mutate them.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute(key)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+class Catalog:
+    """Read-only snapshot of the inventory CSV shared by every session.
+
+    Holds the full inventory, the alcoholic-beverage subset and their lookup
+    indexes. Scanners keep a reference to it; nothing may mutate it in place.
+    """
+
+    def __init__(self, csv_path, inventory_data, signature=None, digest=None):
+        self.csv_path = csv_path
+        self.inventory_data = inventory_data
+        self.signature = signature
+        self.digest = digest
+        if 'name' in inventory_data.columns:
+            self.alcohol_data = inventory_data[
+                inventory_data['name'].str.contains('|'.join(ALCOHOL_KEYWORDS), case=False, na=False)
+            ]
+        else:
+            self.alcohol_data = pd.DataFrame(columns=['name', 'url'])
+        self.index = CatalogIndex(self.inventory_data)
+        self.alcohol_index = CatalogIndex(self.alcohol_data)
+        self._memos = {}
+        self._memos_lock = threading.Lock()
+
+    def lookup_memo(self, kind):
+        """Per-scanner-kind ``LookupMemo`` for this snapshot (size from ``CATALOG_LOOKUP_MEMO_SIZE``)."""
+        memo = self._memos.get(kind)
+        if memo is None:
+            with self._memos_lock:
+                memo = self._memos.get(kind)
+                if memo is None:
+                    memo = self._memos[kind] = LookupMemo(int(os.environ.get('CATALOG_LOOKUP_MEMO_SIZE', 1024)))
+        return memo
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _file_signature(path):
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
+
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_catalog(path, signature, digest):
+    try:
+        if signature is not None:
+            df = pd.read_csv(path)
+            print(f"[SUCCESS] Loaded {len(df)} items from CSV")
+            print(f"[DEBUG] CSV columns: {df.columns.tolist()}")
+            if 'name' not in df.columns or 'url' not in df.columns:
+                print("[WARNING] CSV should have 'name' and 'url' columns")
+        else:
+            print(f"[ERROR] CSV file not found at: {path}")
+            df = pd.DataFrame(columns=['name', 'url'])
+    except Exception as e:
+        print(f"[ERROR] Failed to load CSV: {str(e)}")
+        df = pd.DataFrame(columns=['name', 'url'])
+    catalog = Catalog(path, df, signature, digest)
+    print(f"[SUCCESS] Filtered {len(catalog.alcohol_data)} alcoholic beverages")
+    return catalog
+
+
+def get_catalog(csv_path, force=False):
+    """Return the process-wide catalog for ``csv_path``.
+
+    The CSV is only re-read when its mtime/size changed and its content hash
+    differs from the cached copy (or when ``force`` is set), so a missing or
+    malformed file is not re-parsed on every rerun either.
+    """
+    path = os.path.abspath(csv_path)
+    signature = _file_signature(path)
+    cached = _catalogs.get(path)
+    if not force and cached is not None and cached.signature == signature:
+        return cached
+
+    with _catalogs_lock:
+        cached = _catalogs.get(path)
+        signature = _file_signature(path)
+        if not force and cached is not None and cached.signature == signature:
+            return cached
+        digest = None
+        if signature is not None:
+            try:
+                digest = _file_digest(path)
+            except OSError:
+                signature = None
+        if not force and cached is not None and digest is not None and cached.digest == digest:
+            # Touched but unchanged: keep the parsed catalog
+            cached.signature = signature
+            return cached
+        catalog = _load_catalog(path, signature, digest)
+        _catalogs[path] = catalog
+        return catalog
@@ -0,0 +1,275 @@
+import atexit
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+from .qr_decoders import DecodePipeline, StageStats, create_decoder, selected_decoder_name
+
+
+def _worker_main(shm_name, slot_bytes, backend, scale, crop_upscale, tasks, results):
+    """Decode frames from shared-memory slots until a ``None`` task arrives."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        pipeline = DecodePipeline(create_decoder(backend), scale=scale, crop_upscale=crop_upscale)
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            job_id, slot, shape, dtype = task
+            frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=slot * slot_bytes)
+            try:
+                found = pipeline.decode(frame)
+                del frame
+                results.send((job_id, found, pipeline.last_timings, pipeline.last_hit, None))
+            except Exception as e:
+                del frame
+                results.send((job_id, [], {}, None, str(e)))
+    finally:
+        shm.close()
+
+
+class DecodePool:
+    """Decode frames in worker processes, off the Streamlit script threads.
+
+    Frames are copied into one slot of a shared-memory ring buffer and only
+    ``(job, slot, shape, dtype)`` travels through the least loaded worker's
+    task queue, so numpy arrays are never pickled. Each worker runs its own
+    staged ``DecodePipeline`` and sends symbols back on its own result pipe,
+    where a collector thread hands them to the waiting caller.
+
+    ``decode(image)`` blocks like any other decoder, so the pool can be
+    wrapped by ``RoiTracker``/``MotionGate`` and shared by every station of
+    the server process. A frame that times out keeps its slot out of
+    rotation until its worker answers or dies, so a slow worker never reads
+    a slot that was already handed to the next frame. No queue or pipe is
+    shared between workers: one killed mid-read or mid-write cannot leave a
+    lock held for the others, and its jobs are known when it dies.
+    """
+
+    def __init__(self, workers=2, backend=None, slots=None, max_frame_shape=(480, 640, 3),
+                 scale=0.75, crop_upscale=None, timeout=5.0, max_restarts=10):
+        self.name = backend or selected_decoder_name()
+        self.workers = workers
+        self.slot_count = slots or workers * 2
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.scale = scale
+        self.crop_upscale = crop_upscale
+        self.timeout = timeout
+        self.max_restarts = max_restarts
+        self._ctx = mp.get_context('spawn')
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+        self._free = queue.Queue()
+        for slot in range(self.slot_count):
+            self._free.put(slot)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._next_job = 0
+        self._stats = StageStats()
+        self._counts = {'local': 0, 'timeouts': 0, 'errors': 0, 'restarts': 0, 'reclaimed': 0}
+        self._abandoned = set()
+        self._local = threading.local()
+        self._closed = False
+        self._broken = False
+        self._load = [0] * workers
+        self._tasks = [self._ctx.Queue() for _ in range(workers)]
+        self._results = [None] * workers
+        self._processes = [self._spawn(i) for i in range(workers)]
+        threading.Thread(target=self._collect, daemon=True).start()
+
+    def _spawn(self, index):
+        reader, writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slot_bytes, self.name, self.scale, self.crop_upscale,
+                  self._tasks[index], writer),
+            daemon=True,
+        )
+        process.start()
+        # Only the worker may hold the write end, so its death reads as EOF
+        writer.close()
+        self._results[index] = reader
+        return process
+
+    def _decode_locally(self, image):
+        # Frames bigger than a slot (unusual camera modes), frames finding no
+        # free slot, or every frame once workers keep crashing, are decoded
+        # in-process, with one pipeline per calling thread
+        pipeline = getattr(self._local, 'pipeline', None)
+        if pipeline is None:
+            pipeline = self._local.pipeline = DecodePipeline(
+                create_decoder(self.name), scale=self.scale, crop_upscale=self.crop_upscale
+            )
+        with self._lock:
+            self._counts['local'] += 1
+        return pipeline.decode(image)
+
+    def _local_future(self, image):
+        future = Future()
+        future.set_result(self._decode_locally(image))
+        return future
+
+    def submit(self, image):
+        """Queue ``image`` for decoding and return a ``Future`` of its symbols."""
+        if self._broken or image.nbytes > self.slot_bytes:
+            return self._local_future(image)
+
+        try:
+            slot = self._free.get(timeout=self.timeout)
+        except queue.Empty:
+            # Every slot is busy or held by timed-out jobs
+            return self._local_future(image)
+        target = np.ndarray(image.shape, dtype=image.dtype, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+        target[...] = image
+        del target
+        future = Future()
+        with self._lock:
+            job_id = self._next_job
+            self._next_job += 1
+            worker = self._load.index(min(self._load))
+            self._load[worker] += 1
+            self._pending[job_id] = (future, slot, worker)
+            tasks = self._tasks[worker]
+        future.job_id = job_id
+        tasks.put((job_id, slot, image.shape, image.dtype.str))
+        return future
+
+    def decode(self, image):
+        future = self.submit(image)
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception:
+            # Worker stuck or dead: treat the frame as empty, but keep its slot
+            # quarantined until the result arrives or the worker is found dead
+            job_id = getattr(future, 'job_id', None)
+            with self._lock:
+                self._counts['timeouts'] += 1
+                if job_id in self._pending:
+                    self._abandoned.add(job_id)
+            print(f"[WARNING] Decode pool timed out after {self.timeout:.1f}s")
+            return []
+
+    def _finish(self, job_id, found):
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            self._abandoned.discard(job_id)
+            if entry is not None:
+                self._load[entry[2]] -= 1
+        if entry is None:
+            return
+        future, slot, _ = entry
+        self._free.put(slot)
+        if not future.done():
+            future.set_result(found)
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while not self._closed:
+            # Worker liveness is checked even while results keep flowing
+            if time.monotonic() - last_check >= 0.5:
+                self._check_workers()
+                last_check = time.monotonic()
+            readers = [reader for reader in self._results if reader is not None]
+            if not readers:
+                time.sleep(0.5)
+                continue
+            try:
+                ready = connection.wait(readers, timeout=0.5)
+            except (OSError, ValueError):
+                # A pipe closed under us: the pool is shutting down
+                if self._closed:
+                    break
+                continue
+            for reader in ready:
+                try:
+                    job_id, found, timings, hit, error = reader.recv()
+                except (EOFError, OSError):
+                    # Worker gone, possibly mid-message: stop listening until it is replaced
+                    self._results[self._results.index(reader)] = None
+                    reader.close()
+                    continue
+                with self._lock:
+                    self._stats.record(timings, hit)
+                    if error:
+                        self._counts['errors'] += 1
+                if error:
+                    print(f"[ERROR] Decode worker failed: {error}")
+                self._finish(job_id, found)
+
+    def _check_workers(self):
+        for i, process in enumerate(self._processes):
+            if process.is_alive() or self._closed:
+                continue
+            # Jobs queued on the dead worker will never be answered; its task
+            # queue and result pipe may be left mid-message, so both are replaced
+            with self._lock:
+                lost = [job_id for job_id, entry in self._pending.items() if entry[2] == i]
+                self._counts['reclaimed'] += len(lost)
+                self._tasks[i] = self._ctx.Queue()
+            if self._results[i] is not None:
+                self._results[i].close()
+                self._results[i] = None
+            for job_id in lost:
+                self._finish(job_id, [])
+            if self._broken:
+                continue
+            if self._counts['restarts'] >= self.max_restarts:
+                print("[ERROR] Decode workers keep exiting; decoding in-process from now on")
+                self._broken = True
+                continue
+            print(f"[WARNING] Decode worker {process.pid} exited ({process.exitcode}); restarting")
+            self._processes[i] = self._spawn(i)
+            with self._lock:
+                self._counts['restarts'] += 1
+
+    def stats(self):
+        """Aggregated worker stage timings plus pool counters (local, timeouts, errors, restarts, reclaimed)."""
+        with self._lock:
+            stats = self._stats.snapshot()
+            stats['pool'] = dict(self._counts, workers=self.workers, in_flight=len(self._pending),
+                                 quarantined=len(self._abandoned), broken=self._broken)
+        return stats
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        for reader in self._results:
+            if reader is not None:
+                reader.close()
+        self._shm.close()
+        self._shm.unlink()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_decode_pool():
+    """Return the process-wide decode pool, or ``None`` when ``QR_DECODE_WORKERS`` is 0 (the default)."""
+    global _pool
+    workers = int(os.environ.get('QR_DECODE_WORKERS', 0))
+    if workers <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DecodePool(
+                    workers,
+                    scale=float(os.environ.get('QR_DECODE_SCALE', 0.75)),
+                    crop_upscale=float(os.environ.get('QR_DECODE_CROP_UPSCALE', 0)) or None,
+                )
+                atexit.register(_pool.close)
+                print(f"[SUCCESS] Decode pool started with {workers} worker processes ({_pool.name})")
+    return _pool
@@ -0,0 +1,222 @@
+import hashlib
+import os
+from datetime import datetime
+
+import requests
+
+from .api_client import get_api_client
+from .swr_cache import StaleWhileRevalidateCache
+
+
+class FlightsFetchError(Exception):
+    """The flights endpoint could not be read (network, HTTP or payload error)."""
+
+
+# Shared by every session and both crew homes. Fresh for FLIGHTS_CACHE_TTL
+# seconds, then served stale while one background refresh runs; failures
+# are not retried for FLIGHTS_ERROR_TTL seconds.
+_flights_cache = StaleWhileRevalidateCache(
+    ttl=float(os.environ.get('FLIGHTS_CACHE_TTL', 60)),
+    error_ttl=float(os.environ.get('FLIGHTS_ERROR_TTL', 30)),
+)
+
+
+def _token_scope(token):
+    # Cache key per credential without keeping raw tokens as dict keys
+    if not token:
+        return 'anonymous'
+    return hashlib.sha256(str(token).encode('utf-8')).hexdigest()[:16]
+
+
+def get_upcoming_flights(token=None):
+    """Return upcoming flights for ``token``'s scope from the shared cache.
+
+    Never blocks on the API except for the first request of a scope.
+    """
+    return _flights_cache.get(_token_scope(token), lambda: fetch_upcoming_flights(token), default=[])
+
+
+def fetch_upcoming_flights(token=None):
+    """
+    Fetch upcoming flights from API/Database
+    Returns list of flight dictionaries with real data from the flights table.
+    Raises FlightsFetchError on any failure so the cache can tell an error
+    apart from an empty schedule.
+    """
+    client = get_api_client()
+    api_url = client.url('flights')
+    
+    try:
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        
+        print(f"[DEBUG] Fetching flights from: {api_url}")
+        print(f"[DEBUG] Headers: {headers}")
+        
+        # Fetch flights from API
+        response = client.get('flights', headers=headers)
+        
+        print(f"[DEBUG] Response status: {response.status_code}")
+        print(f"[DEBUG] Response headers: {dict(response.headers)}")
+        
+        if response.status_code == 200:
+            # Try to parse JSON
+            try:
+                content_type = response.headers.get('Content-Type', '')
+                if 'application/json' not in content_type:
+                    print(f"[WARNING] Unexpected content type: {content_type}")
+                
+                flights_data = response.json()
+                print("[DEBUG] Parsed JSON successfully")
+                print(f"[DEBUG] Data type: {type(flights_data)}")
+                
+                # Handle different response structures
+                if isinstance(flights_data, dict):
+                    # Check for common wrapper keys
+                    flights_list = (
+                        flights_data.get('flights') or 
+                        flights_data.get('data') or 
+                        flights_data.get('results') or
+                        []
+                    )
+                    if not flights_list:
+                        # If no wrapper key found, maybe the dict IS a single flight
+                        if 'id' in flights_data or 'flight_number' in flights_data:
+                            flights_list = [flights_data]
+                        else:
+                            print(f"[WARNING] Could not find flights in response. Keys: {flights_data.keys()}")
+                            flights_list = []
+                elif isinstance(flights_data, list):
+                    flights_list = flights_data
+                else:
+                    print(f"[ERROR] Unexpected data type: {type(flights_data)}")
+                    raise FlightsFetchError(f"Unexpected data type: {type(flights_data)}")
+                
+                print(f"[DEBUG] Found {len(flights_list)} flights")
+                if flights_list:
+                    print(f"[DEBUG] First flight sample: {flights_list[0]}")
+                
+                # Parse and format the flight data
+                formatted_flights = []
+                for idx, flight in enumerate(flights_list):
+                    if not isinstance(flight, dict):
+                        print(f"[WARNING] Flight #{idx} is not a dict: {type(flight)}")
+                        continue
+                    
+                    print(f"[DEBUG] Processing flight #{idx}: {flight.keys()}")
+                    
+                    # Parse scheduled_departure datetime
+                    scheduled_departure = (
+                        flight.get('scheduled_departure') or 
+                        flight.get('scheduledDeparture') or
+                        flight.get('departure_time')
+                    )
+                    departure_time = 'N/A'
+                    flight_time_calc = 'N/A'
+                    
+                    if scheduled_departure:
+                        try:
+                            # Handle both datetime and date strings
+                            if 'T' in str(scheduled_departure):
+                                dt = datetime.fromisoformat(str(scheduled_departure).replace('Z', '+00:00'))
+                            else:
+                                # If it's just a date, assume midnight
+                                dt = datetime.strptime(str(scheduled_departure), '%Y-%m-%d')
+                            departure_time = dt.strftime('%H:%M')
+                            
+                            # Calculate flight time if arrival time exists
+                            scheduled_arrival = (
+                                flight.get('scheduled_arrival') or 
+                                flight.get('scheduledArrival') or
+                                flight.get('arrival_time')
+                            )
+                            if scheduled_arrival:
+                                try:
+                                    if 'T' in str(scheduled_arrival):
+                                        arrival_dt = datetime.fromisoformat(str(scheduled_arrival).replace('Z', '+00:00'))
+                                    else:
+                                        arrival_dt = datetime.strptime(str(scheduled_arrival), '%Y-%m-%d')
+                                    duration = arrival_dt - dt
+                                    hours = duration.seconds // 3600
+                                    minutes = (duration.seconds % 3600) // 60
+                                    flight_time_calc = f'{hours}h {minutes}m'
+                                except Exception as e:
+                                    print(f"[WARNING] Error calculating flight time: {e}")
+                        except Exception as e:
+                            print(f"[WARNING] Error parsing departure time '{scheduled_departure}': {e}")
+                    
+                    # Try multiple possible field names for each value
+                    departure_city = (
+                        flight.get('departure_city') or 
+                        flight.get('departureCity') or
+                        flight.get('departure_airport') or
+                        flight.get('origin') or
+                        'N/A'
+                    )
+                    
+                    arrival_city = (
+                        flight.get('arrival_city') or 
+                        flight.get('arrivalCity') or
+                        flight.get('arrival_airport') or
+                        flight.get('destination') or
+                        'N/A'
+                    )
+                    
+                    flight_number = (
+                        flight.get('flight_number') or 
+                        flight.get('flightNumber') or
+                        flight.get('number') or
+                        'N/A'
+                    )
+                    
+                    formatted_flight = {
+                        'time': departure_time,
+                        'departure_city': departure_city,
+                        'destination_city': arrival_city,
+                        'flight_time': flight_time_calc,
+                        'status': flight_number
+                    }
+                    formatted_flights.append(formatted_flight)
+                    print(f"[DEBUG] Formatted flight #{idx}: {formatted_flight}")
+                
+                print(f"[DEBUG] Successfully formatted {len(formatted_flights)} flights")
+                # Return only upcoming flights (limit to 5 most recent)
+                return formatted_flights[:5]
+                
+            except ValueError as json_error:
+                print(f"[ERROR] Failed to parse JSON: {json_error}")
+                print(f"[ERROR] Response text (first 1000 chars): {response.text[:1000]}")
+                raise FlightsFetchError(f"Invalid JSON: {json_error}")
+                
+        elif response.status_code == 401:
+            print("[ERROR] Unauthorized (401) - Token might be invalid or expired")
+            raise FlightsFetchError("HTTP 401")
+        elif response.status_code == 403:
+            print("[ERROR] Forbidden (403) - You don't have permission to access this endpoint")
+            raise FlightsFetchError("HTTP 403")
+        elif response.status_code == 404:
+            print("[ERROR] Not Found (404) - The endpoint /api/flights doesn't exist or returned no data")
+            print(f"[ERROR] Response: {response.text[:500]}")
+            raise FlightsFetchError("HTTP 404")
+        else:
+            print(f"[ERROR] Failed to fetch flights: HTTP {response.status_code}")
+            print(f"[ERROR] Response: {response.text[:500]}")
+            raise FlightsFetchError(f"HTTP {response.status_code}")
+            
+    except FlightsFetchError:
+        raise
+    except requests.exceptions.Timeout:
+        print("[ERROR] Request timeout when fetching flights")
+        raise FlightsFetchError("timeout")
+    except requests.exceptions.ConnectionError as e:
+        print(f"[ERROR] Connection error when fetching flights: {e}")
+        raise FlightsFetchError(str(e))
+    except Exception as e:
+        print(f"[ERROR] Unexpected error fetching flights from API: {e}")
+        import traceback
+        traceback.print_exc()
+        raise FlightsFetchError(str(e))
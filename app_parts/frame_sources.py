@@ -0,0 +1,234 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .qr_decoders import synthetic_frame
+
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "inventory.csv")
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Example URLs from the scanner instructions, used when no catalog CSV exists
+_FALLBACK_PAYLOADS = [f"https://jsonplaceholder.typicode.com/posts/{i}" for i in range(1, 101)]
+
+
+class _PacedSource:
+    """Base for non-device sources: optional real-time pacing and the
+    ``cv2.VideoCapture`` methods ``FrameGrabber`` uses."""
+
+    def __init__(self, fps=None):
+        self.fps = fps
+        self._next_at = None
+        self._opened = True
+
+    def _pace(self):
+        if not self.fps:
+            return
+        now = time.monotonic()
+        if self._next_at is not None and self._next_at > now:
+            time.sleep(self._next_at - now)
+            now = self._next_at
+        self._next_at = now + 1.0 / self.fps
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+class VideoFileSource(_PacedSource):
+    """Frames of a recorded video, paced at ``fps`` (None = as fast as possible)."""
+
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__(fps)
+        self.path = path
+        self.loop = loop
+        self._cap = cv2.VideoCapture(path)
+        self._opened = self._cap.isOpened()
+        self.native_fps = self._cap.get(cv2.CAP_PROP_FPS) if self._opened else 0.0
+
+    def read(self):
+        self._pace()
+        ok, frame = self._cap.read()
+        if not ok and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._cap.read()
+        return ok, frame
+
+    def release(self):
+        super().release()
+        self._cap.release()
+
+
+class ImageFolderSource(_PacedSource):
+    """Images of a directory in name order, paced at ``fps`` (None = as fast as possible)."""
+
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__(fps)
+        self.path = path
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._opened = bool(self.files)
+        self._pos = 0
+
+    def read(self):
+        self._pace()
+        while True:
+            if self._pos >= len(self.files):
+                if not self.loop or not self.files:
+                    return False, None
+                self._pos = 0
+            path = self.files[self._pos]
+            self._pos += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return True, frame
+            print(f"[WARNING] Skipping unreadable image {path}")
+
+
+class SyntheticSource(_PacedSource):
+    """Endless camera-like frames showing QR codes for catalog URLs.
+
+    Every ``hold`` frames a new set of ``codes`` payloads is drawn (the same
+    item held in front of the camera for a while, drifting slightly), with
+    code size, blur and rotation varying within the given ranges. Frames are
+    deterministic for a given ``seed``; ``last_payloads`` is the ground
+    truth of the frame last returned. ``count`` limits the number of frames.
+    """
+
+    def __init__(self, payloads=None, width=640, height=480, fps=None, codes=1, size=(120, 200),
+                 blur=(0, 1), rotation=20.0, hold=15, count=None, seed=0):
+        super().__init__(fps)
+        self.payloads = list(payloads or _FALLBACK_PAYLOADS)
+        self.width = width
+        self.height = height
+        self.codes = codes
+        self.size = size if isinstance(size, tuple) else (size, size)
+        self.blur = blur if isinstance(blur, tuple) else (blur, blur)
+        self.rotation = rotation
+        self.hold = max(1, hold)
+        self.count = count
+        self.frames = 0
+        self.last_payloads = set()
+        self._rng = np.random.default_rng(seed)
+        self._base = None
+        self._offset = (0, 0)
+
+    def _new_scene(self):
+        chosen = [self.payloads[int(i)] for i in self._rng.integers(0, len(self.payloads), self.codes)]
+        size = int(self._rng.integers(self.size[0], self.size[1] + 1))
+        if self.codes > 1:
+            size = min(size, self.width // self.codes - self.width // (6 * self.codes))
+        self._base = synthetic_frame(
+            chosen,
+            width=self.width,
+            height=self.height,
+            size=size,
+            blur=int(self._rng.integers(self.blur[0], self.blur[1] + 1)),
+            rotation=float(self._rng.uniform(-self.rotation, self.rotation)) if self.rotation else 0.0,
+            rng=self._rng,
+        )
+        self._offset = (0, 0)
+        self.last_payloads = set(chosen)
+
+    def read(self):
+        if not self._opened or (self.count is not None and self.frames >= self.count):
+            return False, None
+        self._pace()
+        if self.frames % self.hold == 0:
+            self._new_scene()
+        else:
+            dy, dx = self._rng.integers(-3, 4, 2)
+            self._offset = (self._offset[0] + int(dy), self._offset[1] + int(dx))
+        self.frames += 1
+        return True, np.roll(self._base, self._offset, axis=(0, 1))
+
+
+def catalog_payloads(csv_path=DEFAULT_CATALOG_PATH):
+    """Catalog URLs to render in synthetic frames (example URLs if the CSV is missing)."""
+    try:
+        from .catalog import get_catalog
+        data = get_catalog(csv_path).inventory_data
+        urls = [u for u in data['url'].astype(str).tolist() if u] if 'url' in data.columns else []
+        if urls:
+            return urls
+    except Exception as e:
+        print(f"[WARNING] Could not read catalog for synthetic frames: {e}")
+    return list(_FALLBACK_PAYLOADS)
+
+
+def _parse_options(text):
+    options = {}
+    for part in filter(None, text.split(',')):
+        key, _, value = part.partition('=')
+        options[key.strip()] = value.strip()
+    return options
+
+
+def _range(value, cast):
+    low, _, high = value.partition('-')
+    return (cast(low), cast(high or low))
+
+
+def _open_device(index, width, height, fps):
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        # Keep the driver queue as short as the backend allows
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def open_source(spec=0, width=640, height=480, fps=30, realtime=True):
+    """Open a frame source from ``spec``.
+
+    - device index (``0``, ``"1"``) or stream URL: a camera via ``cv2.VideoCapture``;
+    - path to a directory: its images in name order;
+    - path to a file: a recorded video;
+    - ``"synthetic"`` or ``"synthetic:codes=2,size=110-160,blur=0-2,rotation=25,hold=30,count=500,seed=1,catalog=path"``:
+      generated QR frames for catalog URLs.
+
+    Files, folders and synthetic frames are paced at ``fps`` when
+    ``realtime`` (so they behave like a camera), else read as fast as possible.
+    Returned objects mirror ``cv2.VideoCapture`` (``isOpened``/``read``/``set``/``release``).
+    """
+    pace = fps if realtime else None
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.strip().isdigit()):
+        return _open_device(int(spec), width, height, fps)
+
+    spec = str(spec).strip()
+    if spec == 'synthetic' or spec.startswith('synthetic:'):
+        options = _parse_options(spec.partition(':')[2])
+        return SyntheticSource(
+            catalog_payloads(options.get('catalog', DEFAULT_CATALOG_PATH)),
+            width=width,
+            height=height,
+            fps=pace,
+            codes=int(options.get('codes', 1)),
+            size=_range(options.get('size', '120-200'), int),
+            blur=_range(options.get('blur', '0-1'), int),
+            rotation=float(options.get('rotation', 20)),
+            hold=int(options.get('hold', 15)),
+            count=int(options['count']) if 'count' in options else None,
+            seed=int(options.get('seed', 0)),
+        )
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, fps=pace, loop=realtime)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, fps=pace, loop=realtime)
+    return _open_device(spec, width, height, fps)
+
+
+def default_source():
+    """Frame source the scanner pages use: ``SCANNER_FRAME_SOURCE`` (default camera 0)."""
+    return os.environ.get('SCANNER_FRAME_SOURCE', '0')
@@ -1,93 +1,71 @@
 import streamlit as st
-from .utils import safe_rerun
+from .utils import safe_rerun, render_decode_stats, render_preview_stats, render_lookup_stats
 import cv2
 import numpy as np
-from pyzbar import pyzbar
 import time
-from datetime import datetime
-import pandas as pd
+import functools
+from datetime import datetime, timedelta
 import os
-import requests
+from .catalog import get_catalog
+from .station_worker import get_station_worker, release_station_worker
+from .frame_sources import default_source
+from .preview import preview_from_env
+from .scan_history import ScanHistory
+from .scan_store import get_scan_store, record_scan, date_bounds, HISTORY_PAGE_SIZE
+from .history_export import EXPORT_FORMATS, export_formats, export_file_name, export_history
+from .outbox import get_outbox
+from .api_client import get_api_client
 
 
 class QRInventoryScanner:
     """QR Code Scanner for inventory management using local CSV and API"""
     
-    def __init__(self, csv_path, api_base_url, cooldown_seconds=2):
+    def __init__(self, csv_path, api_base_url=None, cooldown_seconds=2):
         self.csv_path = csv_path
-        self.api_base_url = api_base_url
+        self.api_base_url = api_base_url or get_api_client().base_url
         self.cooldown_seconds = cooldown_seconds
         self.last_scan_time = {}
-        self.inventory_data = None
+        self.catalog = None
         self.load_inventory_data()
         
-    def load_inventory_data(self):
-        """Load inventory data from CSV file"""
-        try:
-            if os.path.exists(self.csv_path):
-                self.inventory_data = pd.read_csv(self.csv_path)
-                print(f"[SUCCESS] Loaded {len(self.inventory_data)} items from CSV")
-                print(f"[DEBUG] CSV columns: {self.inventory_data.columns.tolist()}")
-                
-                # Verify required columns
-                if 'name' not in self.inventory_data.columns or 'url' not in self.inventory_data.columns:
-                    print("[WARNING] CSV should have 'name' and 'url' columns")
-            else:
-                print(f"[ERROR] CSV file not found at: {self.csv_path}")
-                self.inventory_data = pd.DataFrame(columns=['name', 'url'])
-        except Exception as e:
-            print(f"[ERROR] Failed to load CSV: {str(e)}")
-            self.inventory_data = pd.DataFrame(columns=['name', 'url'])
+    def load_inventory_data(self, force=False):
+        """Attach to the shared inventory catalog, reloading it if the CSV changed"""
+        self.catalog = get_catalog(self.csv_path, force=force)
+    
+    @property
+    def inventory_data(self):
+        return self.catalog.inventory_data
+    
+    @property
+    def catalog_index(self):
+        return self.catalog.index
     
     def get_item_from_qr(self, qr_data):
         """Get item information from QR code data using CSV"""
         try:
-            if self.inventory_data is None or self.inventory_data.empty:
-                return None, "CSV no cargado"
-            
-            qr_data_clean = qr_data.strip()
-            
-            # Try exact URL match
-            match = self.inventory_data[self.inventory_data['url'] == qr_data_clean]
-            if not match.empty:
-                item = match.iloc[0]
-                item_id = qr_data_clean.split('/')[-1]  # Extract ID from URL
-                return {
-                    'name': item['name'],
-                    'url': item['url'],
-                    'id': item_id
-                }, None
-            
-            # Try partial match (in case QR has extra parameters)
-            for idx, row in self.inventory_data.iterrows():
-                if pd.notna(row['url']) and row['url'] in qr_data_clean:
-                    item_id = row['url'].split('/')[-1]
-                    return {
-                        'name': row['name'],
-                        'url': row['url'],
-                        'id': item_id
-                    }, None
-            
-            # Try matching by ID extracted from QR
-            qr_id = qr_data_clean.split('/')[-1]
-            for idx, row in self.inventory_data.iterrows():
-                if pd.notna(row['url']) and row['url'].endswith(qr_id):
-                    return {
-                        'name': row['name'],
-                        'url': row['url'],
-                        'id': qr_id
-                    }, None
-            
-            return None, f"Item no encontrado: {qr_data_clean}"
-            
+            # Memoized per catalog snapshot: annotation and process_qr resolve
+            # the same payloads every frame
+            memo = self.catalog.lookup_memo(type(self).__name__)
+            return memo.get(qr_data.strip(), self._resolve_item)
         except Exception as e:
             print(f"[ERROR] Error searching item: {str(e)}")
             return None, str(e)
     
-    def decode_qr_codes(self, frame):
-        """Decode QR codes from frame"""
-        decoded_objects = pyzbar.decode(frame)
-        return decoded_objects
+    def _resolve_item(self, qr_data_clean):
+        """Uncached lookup behind get_item_from_qr"""
+        if self.inventory_data is None or self.inventory_data.empty:
+            return None, "CSV no cargado"
+        
+        # Exact URL, URL contained in the payload, then trailing ID
+        row, item_id = self.catalog_index.resolve(qr_data_clean)
+        if row is not None:
+            return {
+                'name': row['name'],
+                'url': row['url'],
+                'id': item_id
+            }, None
+        
+        return None, f"Item no encontrado: {qr_data_clean}"
     
     def annotate_frame(self, frame, decoded_objects):
         """Draw rectangles and text on frame for detected QR codes"""
@@ -127,7 +105,7 @@ class QRInventoryScanner:
         return False
     
     def send_to_api(self, qr_data, item_data, token=None):
-        """Send scan data to API endpoint /api/scanner"""
+        """Queue scan data for delivery to API endpoint /api/scanner"""
         try:
             # Prepare payload
             payload = {
@@ -142,36 +120,13 @@ class QRInventoryScanner:
                 "action": "inventory_scan"
             }
             
-            # Add authorization header if token is provided
-            headers = {
-                "Content-Type": "application/json"
-            }
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-            
             # API endpoint
             endpoint = f"{self.api_base_url}/scanner"
             
-            print(f"[DEBUG] Sending to API: {endpoint}")
-            print(f"[DEBUG] Payload: {payload}")
-            
-            try:
-                response = requests.post(endpoint, json=payload, headers=headers, timeout=5)
-                
-                if response.status_code in [200, 201]:
-                    print(f"[SUCCESS] Data sent to API: {item_data.get('name')}")
-                    result = response.json() if response.text else {}
-                    return True, result
-                else:
-                    print(f"[WARNING] API returned {response.status_code}: {response.text}")
-                    # Return success anyway since we have local data
-                    return True, {"api_status": response.status_code, "api_message": "API responded with error"}
-            except requests.exceptions.ConnectionError:
-                print("[WARNING] Could not connect to API, storing locally only")
-                return True, {"api_error": "API offline - stored locally"}
-            except requests.exceptions.Timeout:
-                print("[WARNING] API request timed out")
-                return True, {"api_error": "API timeout - stored locally"}
+            # Queue durably; the outbox sender delivers it in the background
+            outbox_id = get_outbox().enqueue(endpoint, payload, token)
+            print(f"[DEBUG] Queued scan #{outbox_id} for {endpoint}")
+            return True, {"queued": True, "outbox_id": outbox_id}
             
         except Exception as e:
             print(f"[ERROR] Failed to send to API: {str(e)}")
@@ -193,7 +148,7 @@ class QRInventoryScanner:
             item_name = item_data['name']
             item_id = item_data['id']
             
-            # Send to API (non-blocking - we proceed even if it fails)
+            # Queue for the API (never blocks on the network)
             api_success, api_result = self.send_to_api(qr_data, item_data, token)
             
             # Build result
@@ -239,10 +194,12 @@ def render():
         # Build path relative to this script
         script_dir = os.path.dirname(os.path.abspath(__file__))
         csv_path = os.path.join(script_dir, "..", "data", "inventory.csv")
-        api_base = "https://summitlogicapidb-production.up.railway.app/api"
-        st.session_state['inventory_qr_scanner'] = QRInventoryScanner(csv_path, api_base, cooldown_seconds=2)
-    if 'inventory_scan_history' not in st.session_state:
-        st.session_state['inventory_scan_history'] = []
+        st.session_state['inventory_qr_scanner'] = QRInventoryScanner(csv_path, cooldown_seconds=2)
+    else:
+        # Re-attach to the shared catalog (only re-read when the CSV changed)
+        st.session_state['inventory_qr_scanner'].load_inventory_data()
+    if not isinstance(st.session_state.get('inventory_scan_history'), ScanHistory):
+        st.session_state['inventory_scan_history'] = ScanHistory()
     
     # Create tabs for Inventory sections
     tab1, tab2, tab3 = st.tabs(["📋 Inventario General", "📷 Escáner QR", "📊 Historial"])
@@ -276,7 +233,7 @@ def render():
             """)
             
             if st.button("🔄 Reintentar Carga"):
-                scanner.load_inventory_data()
+                scanner.load_inventory_data(force=True)
                 st.rerun()
             return
         
@@ -287,10 +244,10 @@ def render():
         with col1:
             st.metric("Items en Inventario", total_items)
         with col2:
-            unique_scanned = len(set([s.get('item_id', '') for s in st.session_state['inventory_scan_history']]))
+            unique_scanned = st.session_state['inventory_scan_history'].unique_item_ids
             st.metric("Items Únicos Escaneados", unique_scanned)
         with col3:
-            total_scanned = len(st.session_state.get('inventory_scan_history', []))
+            total_scanned = st.session_state['inventory_scan_history'].total
             st.metric("Escaneos Totales", total_scanned)
         
         st.markdown("---")
@@ -314,7 +271,7 @@ def render():
         col1, col2, col3 = st.columns([1, 1, 2])
         with col1:
             if st.button("🔄 Recargar CSV", use_container_width=True):
-                scanner.load_inventory_data()
+                scanner.load_inventory_data(force=True)
                 st.success("✅ CSV recargado")
                 st.rerun()
         
@@ -356,8 +313,18 @@ def render():
                 key="toggle_qr_scanner"
             ):
                 st.session_state['qr_scanner_active'] = not st.session_state['qr_scanner_active']
+                if not st.session_state['qr_scanner_active']:
+                    release_station_worker(default_source())
                 st.rerun()
         
+        # Kiosk mode: scan without the automatic pause, camera kept open
+        continuous = st.checkbox(
+            "🔁 Modo continuo (kiosco)",
+            value=os.environ.get('SCANNER_KIOSK_MODE', '0') == '1',
+            key="kiosk_mode",
+            help="Mantiene la cámara abierta y escanea sin pausas automáticas",
+        )
+        
         # Scanner interface
         if st.session_state['qr_scanner_active']:
             st.success("✅ Escáner activo - Apunta la cámara al código QR")
@@ -365,42 +332,37 @@ def render():
             # Status and camera placeholders
             status_placeholder = st.empty()
             camera_placeholder = st.empty()
+            counter_placeholder = st.empty()
             
             # Get token from session
             token = st.session_state.get('token')
             
-            # Try to open camera
-            cap = cv2.VideoCapture(0)
+            # Camera capture and decoding run in a per-station worker that
+            # outlives reruns, so the camera is not reopened every cycle
+            worker = get_station_worker(default_source(), width=640, height=480, fps=30)
             
-            if not cap.isOpened():
+            if not worker.ensure_started():
                 st.error("❌ No se pudo acceder a la cámara. Verifica los permisos.")
                 st.session_state['qr_scanner_active'] = False
                 if st.button("🔄 Reintentar", key="retry_camera"):
                     st.rerun()
                 st.stop()
             
-            # Set camera properties
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
-            
             try:
-                # Scanning loop (limited iterations to allow page interaction)
+                # Scanning loop (pauses after ~5 s unless in kiosk mode)
                 frame_count = 0
                 max_frames = 150  # ~5 seconds at 30fps
+                last_seq = 0
+                preview = preview_from_env()
                 
-                while st.session_state['qr_scanner_active'] and frame_count < max_frames:
-                    ret, frame = cap.read()
+                while st.session_state['qr_scanner_active'] and (continuous or frame_count < max_frames):
+                    # Newest frame and its QR codes, decoded by the worker
+                    latest = worker.next_result(last_seq)
                     
-                    if not ret:
+                    if latest is None:
                         status_placeholder.error("❌ Error al leer de la cámara")
                         break
-                    
-                    # Decode QR codes
-                    decoded_objects = scanner.decode_qr_codes(frame)
-                    
-                    # Annotate frame with QR info
-                    annotated_frame = scanner.annotate_frame(frame.copy(), decoded_objects)
+                    last_seq, frame, decoded_objects = latest
                     
                     # Process detected QR codes
                     for obj in decoded_objects:
@@ -414,34 +376,32 @@ def render():
                                 status_placeholder.success(f"✅ Producto detectado: **{item_name}**")
                                 
                                 # Add to history
-                                st.session_state['inventory_scan_history'].insert(0, {
-                                    'data': qr_data,
-                                    'item_name': item_name,
-                                    'item_id': result.get('item_id', 'N/A') if result else 'N/A',
-                                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                    'status': 'success',
-                                    'result': result
-                                })
+                                st.session_state['inventory_scan_history'].add(result)
+                                record_scan(result, 'inventory')
+                                counter_placeholder.caption(f"📦 {st.session_state['inventory_scan_history'].total} escaneos registrados")
                             else:
                                 status_placeholder.warning(f"⚠️ {item_name}")
                     
-                    # Convert BGR to RGB and display
-                    annotated_frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-                    camera_placeholder.image(annotated_frame_rgb, channels="RGB", use_container_width=True)
+                    # Preview: rate-limited, downscaled JPEG, only when the scene changed
+                    if preview.wants(frame, decoded_objects):
+                        annotated_frame = scanner.annotate_frame(frame.copy(), decoded_objects)
+                        preview.show(camera_placeholder, annotated_frame)
                     
                     frame_count += 1
-                    time.sleep(0.033)  # ~30fps
                 
                 # Auto-stop message
-                if frame_count >= max_frames:
+                if not continuous and frame_count >= max_frames:
                     st.session_state['qr_scanner_active'] = False
                     st.info("ℹ️ Escáner pausado. Presiona 'Iniciar Escáner' para continuar.")
                     
             except Exception as e:
                 st.error(f"❌ Error en el escáner: {str(e)}")
                 print(f"[ERROR] Scanner exception: {e}")
-            finally:
-                cap.release()
+            
+            # How the frame budget was split between conversion, decode and preview
+            render_decode_stats(worker.decoder)
+            render_preview_stats(preview)
+            render_lookup_stats(scanner)
         
         else:
             st.info("ℹ️ El escáner está detenido.")
@@ -451,7 +411,7 @@ def render():
             2. Permite el acceso a la cámara cuando el navegador lo solicite
             3. Apunta la cámara al código QR del producto
             4. El sistema buscará el producto en el inventario y lo enviará a la API
-            5. El escáner se pausará automáticamente después de ~5 segundos
+            5. El escáner se pausará automáticamente después de ~5 segundos (salvo en modo continuo)
             
             **Formato del QR:** El código QR debe contener la URL completa del producto:
             - Ejemplo: `https://jsonplaceholder.typicode.com/posts/1`
@@ -465,79 +425,99 @@ def render():
     with tab3:
         st.markdown("### 📊 Historial de Escaneos")
         
-        if st.session_state['inventory_scan_history']:
+        # Filters over the shared scan log (every session and station)
+        store = get_scan_store()
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            today = datetime.now().date()
+            history_dates = st.date_input("📅 Fechas", value=(today - timedelta(days=6), today), key="history_dates")
+        with fcol2:
+            station_choice = st.selectbox("🖥️ Estación", ["Todas"] + store.stations('inventory'), key="history_station")
+        with fcol3:
+            user_choice = st.text_input("👤 Usuario", key="history_user").strip()
+        start_ts, end_ts = date_bounds(history_dates)
+        history_filters = {
+            'page': 'inventory',
+            'start': start_ts,
+            'end': end_ts,
+            'station': None if station_choice == "Todas" else station_choice,
+            'user': user_choice or None,
+        }
+        summary = store.summary(**history_filters)
+        
+        if summary['total']:
             # Show stats
-            total_scans = len(st.session_state['inventory_scan_history'])
-            successful_scans = len([s for s in st.session_state['inventory_scan_history'] if s['status'] == 'success'])
-            
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Escaneos", total_scans)
+                st.metric("Total Escaneos", summary['total'])
             with col2:
-                st.metric("Exitosos", successful_scans)
+                st.metric("Exitosos", summary['successful'])
             with col3:
-                unique_items = len(set([s.get('item_name', 'Unknown') for s in st.session_state['inventory_scan_history']]))
-                st.metric("Items Únicos", unique_items)
+                st.metric("Items Únicos", summary['unique_items'])
+            
+            # Delivery backlog of the local outbox
+            try:
+                backlog = get_outbox().stats()
+                if backlog['pending']:
+                    st.caption(f"📤 Cola de envío: {backlog['pending']} pendientes · el más antiguo hace {int(backlog['oldest_age'])} s")
+                else:
+                    st.caption("📤 Cola de envío: todos los escaneos fueron enviados a la API")
+                if backlog['rejected']:
+                    st.caption(f"⚠️ {backlog['rejected']} escaneos rechazados por la API")
+            except Exception as e:
+                print(f"[WARNING] Could not read outbox stats: {e}")
             
             st.markdown("---")
             
-            # Export and clear buttons
+            # Export and session counter buttons
             col1, col2 = st.columns(2)
             with col1:
-                if st.button("🗑️ Limpiar Historial", key="clear_history", use_container_width=True):
-                    st.session_state['inventory_scan_history'] = []
+                if st.button("🗑️ Reiniciar Contadores de Sesión", key="clear_history", use_container_width=True):
+                    st.session_state['inventory_scan_history'].clear()
                     st.rerun()
             with col2:
-                # Create downloadable CSV
-                if st.session_state['inventory_scan_history']:
-                    history_df = pd.DataFrame([
-                        {
-                            'Producto': s['item_name'],
-                            'ID': s['item_id'],
-                            'Fecha': s['timestamp'],
-                            'Usuario': s.get('result', {}).get('scanned_by', 'N/A')
-                        }
-                        for s in st.session_state['inventory_scan_history']
-                    ])
-                    csv = history_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Descargar Historial CSV",
-                        data=csv,
-                        file_name=f"historial_escaneos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
-            
-            # Display scan history
+                # Built only when clicked, streamed from the persistent log (filtered dates/station/user)
+                export_format = st.selectbox("Formato", export_formats(), key="history_export_format", label_visibility="collapsed")
+                st.download_button(
+                    label=f"📥 Descargar Historial {export_format}",
+                    data=functools.partial(export_history, store, history_filters, export_format, 'Producto'),
+                    file_name=export_file_name("historial_escaneos", export_format),
+                    mime=EXPORT_FORMATS[export_format][1],
+                    use_container_width=True
+                )
+            
+            # Display scan history, one page at a time
             st.markdown("### Últimos Escaneos")
-            for idx, scan in enumerate(st.session_state['inventory_scan_history'][:20]):
-                item_name = scan.get('item_name', 'Unknown Item')
-                item_id = scan.get('item_id', 'N/A')
+            page_count = max(1, -(-summary['total'] // HISTORY_PAGE_SIZE))
+            page_number = st.number_input("Página", min_value=1, max_value=page_count, value=1, step=1, key="history_page")
+            st.caption(f"Página {page_number} de {page_count} · {summary['total']} escaneos")
+            
+            scans = store.query(limit=HISTORY_PAGE_SIZE, offset=(page_number - 1) * HISTORY_PAGE_SIZE, **history_filters)
+            for scan in scans:
+                item_name = scan['item_name'] or 'Unknown Item'
+                item_id = scan['item_id']
+                scanned_at = datetime.fromtimestamp(scan['ts']).strftime('%Y-%m-%d %H:%M:%S')
                 
-                with st.expander(f"{'✅' if scan['status'] == 'success' else '❌'} **{item_name}** (ID: {item_id}) - {scan['timestamp']}"):
+                with st.expander(f"{'✅' if scan['status'] == 'success' else '❌'} **{item_name}** (ID: {item_id}) - {scanned_at}", key=f"inventory_scan_{scan['id']}"):
                     col1, col2 = st.columns([2, 1])
                     with col1:
                         st.write(f"**🏷️ Producto:** {item_name}")
                         st.write(f"**🔢 ID:** {item_id}")
-                        if scan.get('result', {}).get('item_url'):
-                            st.write(f"**🔗 URL:** `{scan['result']['item_url']}`")
+                        if scan['item_url']:
+                            st.write(f"**🔗 URL:** `{scan['item_url']}`")
                     with col2:
-                        st.write(f"**⏰ Hora:** {scan['timestamp']}")
-                        st.write(f"**👤 Usuario:** {scan.get('result', {}).get('scanned_by', 'N/A')}")
+                        st.write(f"**⏰ Hora:** {scanned_at}")
+                        st.write(f"**👤 Usuario:** {scan['user']}")
+                        st.write(f"**🖥️ Estación:** {scan['station']}")
                     
                     # Show API status
-                    if scan.get('result', {}).get('api_response'):
-                        api_resp = scan['result']['api_response']
-                        if 'api_error' in api_resp:
-                            st.warning(f"⚠️ API: {api_resp['api_error']}")
-                        elif 'api_status' in api_resp:
-                            st.info(f"ℹ️ API Status: {api_resp['api_status']}")
-                        else:
-                            st.success("✅ Enviado a API exitosamente")
+                    if scan['api_error']:
+                        st.warning(f"⚠️ API: {scan['api_error']}")
+                    elif scan['outbox_id']:
+                        st.info(f"📤 Encolado para la API (#{scan['outbox_id']})")
                     
-                    if scan.get('result') and scan['result'].get('full_data'):
-                        with st.expander("📄 Ver datos completos"):
-                            st.json(scan['result']['full_data'])
+                    with st.expander("📄 Ver datos completos", key=f"inventory_details_{scan['id']}"):
+                        st.json(scan)
         else:
             st.info("📭 No hay escaneos registrados todavía. Ve a la pestaña 'Escáner QR' para comenzar.")
             
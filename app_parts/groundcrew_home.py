@@ -1,12 +1,9 @@
 import streamlit as st
 import os
 import json
-import requests
 from datetime import datetime
-from .ground_alcohol import render as render_alcohol
-from .ground_inventory import render as render_inventory
-from .ground_training import render as render_training
-from .utils import safe_rerun
+from .utils import safe_rerun, render_api_status
+from .flights import get_upcoming_flights
 
 
 def render_groundcrew(uri1=None, uri2=None, standalone=True):
@@ -118,6 +115,9 @@ def render_groundcrew(uri1=None, uri2=None, standalone=True):
             </div>
             """, unsafe_allow_html=True)
 
+        # Backend circuit breaker state (fail-fast while the API is down)
+        render_api_status()
+
     with col_main:
         # Tab navigation
         st.markdown("""
@@ -197,187 +197,6 @@ def render_groundcrew(uri1=None, uri2=None, standalone=True):
         st.markdown("<a href='./' style='color:var(--gold); text-decoration:none;'>Volver a la app principal</a>", unsafe_allow_html=True)
 
 
-def get_upcoming_flights(token=None):
-    """
-    Fetch upcoming flights from API/Database
-    Returns list of flight dictionaries with real data from the flights table
-    """
-    api_url = "https://summitlogicapidb-production.up.railway.app/api/flights"
-    
-    try:
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
-        if token:
-            headers['Authorization'] = f'Bearer {token}'
-        
-        print(f"[DEBUG] Fetching flights from: {api_url}")
-        print(f"[DEBUG] Headers: {headers}")
-        
-        # Fetch flights from API
-        response = requests.get(api_url, headers=headers, timeout=10)
-        
-        print(f"[DEBUG] Response status: {response.status_code}")
-        print(f"[DEBUG] Response headers: {dict(response.headers)}")
-        
-        if response.status_code == 200:
-            # Try to parse JSON
-            try:
-                content_type = response.headers.get('Content-Type', '')
-                if 'application/json' not in content_type:
-                    print(f"[WARNING] Unexpected content type: {content_type}")
-                
-                flights_data = response.json()
-                print(f"[DEBUG] Parsed JSON successfully")
-                print(f"[DEBUG] Data type: {type(flights_data)}")
-                
-                # Handle different response structures
-                if isinstance(flights_data, dict):
-                    # Check for common wrapper keys
-                    flights_list = (
-                        flights_data.get('flights') or 
-                        flights_data.get('data') or 
-                        flights_data.get('results') or
-                        []
-                    )
-                    if not flights_list:
-                        # If no wrapper key found, maybe the dict IS a single flight
-                        if 'id' in flights_data or 'flight_number' in flights_data:
-                            flights_list = [flights_data]
-                        else:
-                            print(f"[WARNING] Could not find flights in response. Keys: {flights_data.keys()}")
-                            flights_list = []
-                elif isinstance(flights_data, list):
-                    flights_list = flights_data
-                else:
-                    print(f"[ERROR] Unexpected data type: {type(flights_data)}")
-                    return []
-                
-                print(f"[DEBUG] Found {len(flights_list)} flights")
-                if flights_list:
-                    print(f"[DEBUG] First flight sample: {flights_list[0]}")
-                
-                # Parse and format the flight data
-                formatted_flights = []
-                for idx, flight in enumerate(flights_list):
-                    if not isinstance(flight, dict):
-                        print(f"[WARNING] Flight #{idx} is not a dict: {type(flight)}")
-                        continue
-                    
-                    print(f"[DEBUG] Processing flight #{idx}: {flight.keys()}")
-                    
-                    # Parse scheduled_departure datetime
-                    scheduled_departure = (
-                        flight.get('scheduled_departure') or 
-                        flight.get('scheduledDeparture') or
-                        flight.get('departure_time')
-                    )
-                    departure_time = 'N/A'
-                    flight_time_calc = 'N/A'
-                    
-                    if scheduled_departure:
-                        try:
-                            # Handle both datetime and date strings
-                            if 'T' in str(scheduled_departure):
-                                dt = datetime.fromisoformat(str(scheduled_departure).replace('Z', '+00:00'))
-                            else:
-                                # If it's just a date, assume midnight
-                                dt = datetime.strptime(str(scheduled_departure), '%Y-%m-%d')
-                            departure_time = dt.strftime('%H:%M')
-                            
-                            # Calculate flight time if arrival time exists
-                            scheduled_arrival = (
-                                flight.get('scheduled_arrival') or 
-                                flight.get('scheduledArrival') or
-                                flight.get('arrival_time')
-                            )
-                            if scheduled_arrival:
-                                try:
-                                    if 'T' in str(scheduled_arrival):
-                                        arrival_dt = datetime.fromisoformat(str(scheduled_arrival).replace('Z', '+00:00'))
-                                    else:
-                                        arrival_dt = datetime.strptime(str(scheduled_arrival), '%Y-%m-%d')
-                                    duration = arrival_dt - dt
-                                    hours = duration.seconds // 3600
-                                    minutes = (duration.seconds % 3600) // 60
-                                    flight_time_calc = f'{hours}h {minutes}m'
-                                except Exception as e:
-                                    print(f"[WARNING] Error calculating flight time: {e}")
-                        except Exception as e:
-                            print(f"[WARNING] Error parsing departure time '{scheduled_departure}': {e}")
-                    
-                    # Try multiple possible field names for each value
-                    departure_city = (
-                        flight.get('departure_city') or 
-                        flight.get('departureCity') or
-                        flight.get('departure_airport') or
-                        flight.get('origin') or
-                        'N/A'
-                    )
-                    
-                    arrival_city = (
-                        flight.get('arrival_city') or 
-                        flight.get('arrivalCity') or
-                        flight.get('arrival_airport') or
-                        flight.get('destination') or
-                        'N/A'
-                    )
-                    
-                    flight_number = (
-                        flight.get('flight_number') or 
-                        flight.get('flightNumber') or
-                        flight.get('number') or
-                        'N/A'
-                    )
-                    
-                    formatted_flight = {
-                        'time': departure_time,
-                        'departure_city': departure_city,
-                        'destination_city': arrival_city,
-                        'flight_time': flight_time_calc,
-                        'status': flight_number
-                    }
-                    formatted_flights.append(formatted_flight)
-                    print(f"[DEBUG] Formatted flight #{idx}: {formatted_flight}")
-                
-                print(f"[DEBUG] Successfully formatted {len(formatted_flights)} flights")
-                # Return only upcoming flights (limit to 5 most recent)
-                return formatted_flights[:5]
-                
-            except ValueError as json_error:
-                print(f"[ERROR] Failed to parse JSON: {json_error}")
-                print(f"[ERROR] Response text (first 1000 chars): {response.text[:1000]}")
-                return []
-                
-        elif response.status_code == 401:
-            print(f"[ERROR] Unauthorized (401) - Token might be invalid or expired")
-            return []
-        elif response.status_code == 403:
-            print(f"[ERROR] Forbidden (403) - You don't have permission to access this endpoint")
-            return []
-        elif response.status_code == 404:
-            print(f"[ERROR] Not Found (404) - The endpoint /api/flights doesn't exist or returned no data")
-            print(f"[ERROR] Response: {response.text[:500]}")
-            return []
-        else:
-            print(f"[ERROR] Failed to fetch flights: HTTP {response.status_code}")
-            print(f"[ERROR] Response: {response.text[:500]}")
-            return []
-            
-    except requests.exceptions.Timeout:
-        print(f"[ERROR] Request timeout when fetching flights")
-        return []
-    except requests.exceptions.ConnectionError as e:
-        print(f"[ERROR] Connection error when fetching flights: {e}")
-        return []
-    except Exception as e:
-        print(f"[ERROR] Unexpected error fetching flights from API: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-
 def get_destination_weather():
     """
     Fetch weather data for destination cities from API
@@ -0,0 +1,92 @@
+import csv
+import importlib.util
+import io
+import tempfile
+from datetime import datetime
+
+
+# Download formats: extension and MIME type
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def export_formats():
+    """Formats offered for download (Parquet only when pyarrow is installed)."""
+    return list(EXPORT_FORMATS) if importlib.util.find_spec('pyarrow') else ['CSV']
+
+
+def export_file_name(prefix, fmt):
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def _export_rows(events, item_label, extra):
+    for event in events:
+        row = {
+            item_label: event['item_name'],
+            'ID': event['item_id'],
+            'Fecha': datetime.fromtimestamp(event['ts']),
+            'Usuario': event['user'],
+            'Estación': event['station'],
+        }
+        row.update(extra)
+        yield row
+
+
+def _write_csv(chunks, columns, out):
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text, lineterminator='\n')
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(
+            [row[c].strftime('%Y-%m-%d %H:%M:%S') if c == 'Fecha' else row[c] for c in columns] for row in rows
+        )
+    text.detach()
+
+
+def _write_parquet(chunks, columns, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.timestamp('s') if c == 'Fecha' else pa.string()) for c in columns])
+    with pq.ParquetWriter(out, schema) as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(
+                [{c: row[c] if c == 'Fecha' or row[c] is None else str(row[c]) for c in columns} for row in rows],
+                schema=schema,
+            ))
+
+
+def export_history(store, filters, fmt='CSV', item_label='Producto', extra=None, chunk_size=5000):
+    """Export the store events matching ``filters``, newest first, as a CSV or Parquet file.
+
+    Events are read and written ``chunk_size`` at a time (one Parquet row
+    group per chunk) into a temporary file on disk, so neither a DataFrame
+    nor an in-memory copy of the export is built; the open file, rewound,
+    is returned. Meant as the lazy ``data`` callable of
+    ``st.download_button``: it only runs when the user clicks download, and
+    Streamlit then reads the file once to serve it.
+    """
+    extra = extra or {}
+    columns = [item_label, 'ID', 'Fecha', 'Usuario', 'Estación'] + list(extra)
+    chunks = (
+        list(_export_rows(events, item_label, extra))
+        for events in store.iter_events(chunk_size=chunk_size, **filters)
+    )
+    # Streamlit accepts raw files but not read/write buffered ones: buffer the
+    # writes, then hand over the unbuffered file
+    raw = tempfile.TemporaryFile(buffering=0)
+    try:
+        out = io.BufferedWriter(raw)
+        if fmt == 'Parquet':
+            _write_parquet(chunks, columns, out)
+        else:
+            _write_csv(chunks, columns, out)
+        out.flush()
+        out.detach()
+    except Exception:
+        raw.close()
+        raise
+    raw.seek(0)
+    return raw
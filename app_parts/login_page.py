@@ -2,12 +2,14 @@ import streamlit as st
 import requests
 from .utils import _valid_email, load_users, save_users, hash_password, safe_rerun
 from .utils import save_session
+from .api_client import get_api_client
 import os
 
 
 def authenticate_remote(login_id, login_pw):
     """Attempt remote authentication using email. Returns (success, user_data, token, error_msg)"""
-    login_api = "https://summitlogicapidb-production.up.railway.app/api/auth/login"
+    client = get_api_client()
+    login_api = client.url('auth/login')
     
     try:
         # API requires email and password fields
@@ -17,7 +19,7 @@ def authenticate_remote(login_id, login_pw):
         print(f"[DEBUG] Login attempt - API: {login_api}")
         print(f"[DEBUG] Payload: {payload}")
         
-        resp = requests.post(login_api, json=payload, timeout=8)
+        resp = client.post('auth/login', json=payload)
         
         # Debug: Print response
         print(f"[DEBUG] Response Status: {resp.status_code}")
@@ -202,7 +204,6 @@ def render_login(uri1=None, uri2=None, is_standalone=False, public_flight_access
                         
                         if not user_exists:
                             # Try remote registration
-                            api_url = "https://summitlogicapidb-production.up.railway.app/api/auth/register"
                             role_send_map = {"FlightCrew": "Flight Crew", "GroundCrew": "Ground Crew"}
                             payload = {
                                 "firstName": reg_name.strip(),
@@ -215,7 +216,7 @@ def render_login(uri1=None, uri2=None, is_standalone=False, public_flight_access
                             
                             try:
                                 with st.spinner("Registrando..."):
-                                    resp = requests.post(api_url, json=payload, timeout=10)
+                                    resp = get_api_client().post('auth/register', json=payload)
                                 
                                 if 200 <= resp.status_code < 300:
                                     # Remote registration successful
@@ -0,0 +1,283 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+
+from .api_client import CircuitOpenError, get_api_client
+
+
+# Client errors worth retrying: timeouts, rate limits and auth failures
+# (an expired token must not drop the scans queued meanwhile)
+RETRYABLE_STATUS = (401, 403, 408, 429)
+AUTH_ERRORS = ('HTTP 401', 'HTTP 403')
+_AUTH_ERRORS_SQL = ", ".join("?" * len(AUTH_ERRORS))
+
+
+def _default_db_path():
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'scan_outbox.db')
+
+
+class ScanOutbox:
+    """Durable local queue of scan events waiting to be delivered to the API.
+
+    Scans are committed to SQLite (WAL mode) before the camera loop moves on
+    and a background thread drains them with exponential backoff, so API
+    outages or container restarts never lose a scan. Events are coalesced
+    and flushed as one ``POST {endpoint}/batch`` when ``batch_size`` are
+    due or the oldest has waited ``batch_window_ms``; APIs without a batch
+    route get the events posted one by one. Delivery goes through the
+    shared pooled API client.
+    """
+
+    def __init__(self, db_path=None, max_backoff=300, batch_size=25, batch_window_ms=250, client=None):
+        self.db_path = db_path or _default_db_path()
+        self.client = client or get_api_client()
+        self.max_backoff = max_backoff
+        self.batch_size = max(1, int(batch_size))
+        self.batch_window = max(0, batch_window_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._no_batch_endpoints = set()
+        self._token = None
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                token TEXT,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                last_error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+        self._conn.commit()
+
+    def enqueue(self, endpoint, payload, token=None):
+        """Persist a scan event and wake the sender. Returns the outbox row id."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (endpoint, payload, token, created_at, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                (endpoint, json.dumps(payload, ensure_ascii=False), token, now, now),
+            )
+            if token and token != self._token:
+                # Scans held back by an expired/invalid token go out again with the fresh one
+                self._conn.execute(
+                    "UPDATE outbox SET token = ?, next_attempt_at = ? WHERE status = 'pending' "
+                    f"AND last_error IN ({_AUTH_ERRORS_SQL}) AND (token IS NULL OR token != ?)",
+                    (token, now, *AUTH_ERRORS, token),
+                )
+                self._token = token
+            self._conn.commit()
+            row_id = cur.lastrowid
+        self._wake.set()
+        return row_id
+
+    def stats(self):
+        """Return backlog readout: pending count, rejected count and age of the oldest unsent scan."""
+        with self._lock:
+            pending, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+            rejected = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'rejected'"
+            ).fetchone()[0]
+        return {
+            'pending': pending,
+            'rejected': rejected,
+            'oldest_age': (time.time() - oldest) if oldest is not None else None,
+        }
+
+    def start(self):
+        """Start the background sender (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="scan-outbox", daemon=True)
+            self._thread.start()
+
+    def _due_rows(self, now):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, endpoint, payload, token, attempts, next_attempt_at FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?",
+                (now, self.batch_size),
+            ).fetchall()
+
+    def _next_due_at(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def _sleep(self, seconds=None):
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def close(self, timeout=5.0):
+        """Stop the sender and close the database. Undelivered scans stay queued on disk."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._conn.close()
+
+    def _run(self):
+        while not self._closed:
+            try:
+                now = time.time()
+                rows = self._due_rows(now)
+                if not rows:
+                    due = self._next_due_at()
+                    self._sleep(None if due is None else max(0.0, due - now))
+                    continue
+                # Coalescing window: hold a partial batch until it fills up or
+                # its oldest event has waited batch_window seconds
+                flush_at = rows[0][5] + self.batch_window
+                if len(rows) < self.batch_size and now < flush_at:
+                    self._sleep(flush_at - now)
+                    continue
+
+                self._send(rows)
+            except Exception as e:
+                if self._closed:
+                    break
+                print(f"[ERROR] Outbox sender failed: {str(e)}")
+                time.sleep(1)
+
+    def _send(self, rows):
+        # One batch per endpoint and token
+        groups = {}
+        for row_id, endpoint, payload, token, attempts, _ in rows:
+            groups.setdefault((endpoint, token), []).append((row_id, json.loads(payload), attempts))
+        for (endpoint, token), items in groups.items():
+            self._deliver_batch(endpoint, token, items)
+
+    def _headers(self, token):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def _deliver_batch(self, endpoint, token, items):
+        if len(items) == 1 or endpoint in self._no_batch_endpoints:
+            for row_id, payload, attempts in items:
+                self._deliver(row_id, endpoint, payload, token, attempts)
+            return
+
+        ids = [row_id for row_id, _, _ in items]
+        try:
+            response = self.client.post(
+                f"{endpoint}/batch",
+                json={"events": [payload for _, payload, _ in items]},
+                headers=self._headers(token),
+            )
+        except CircuitOpenError as e:
+            self._defer(ids, e.retry_in)
+            return
+        except requests.exceptions.RequestException as e:
+            for row_id, _, attempts in items:
+                self._retry(row_id, attempts, str(e))
+            return
+
+        if 200 <= response.status_code < 300:
+            self._delete(ids)
+            print(f"[SUCCESS] Outbox delivered batch of {len(ids)} scans")
+        elif response.status_code in (404, 405):
+            # No batch route on this API: post one by one over the same connection
+            print(f"[WARNING] {endpoint}/batch not available ({response.status_code}); sending scans individually")
+            self._no_batch_endpoints.add(endpoint)
+            self._deliver_batch(endpoint, token, items)
+        elif 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_STATUS:
+            # Isolate the payload(s) the API objects to
+            for row_id, payload, attempts in items:
+                self._deliver(row_id, endpoint, payload, token, attempts)
+        else:
+            for row_id, _, attempts in items:
+                self._retry(row_id, attempts, f"HTTP {response.status_code}")
+
+    def _deliver(self, row_id, endpoint, payload, token, attempts):
+        try:
+            response = self.client.post(endpoint, json=payload, headers=self._headers(token))
+        except CircuitOpenError as e:
+            self._defer([row_id], e.retry_in)
+            return
+        except requests.exceptions.RequestException as e:
+            self._retry(row_id, attempts, str(e))
+            return
+
+        if 200 <= response.status_code < 300:
+            self._delete([row_id])
+            print(f"[SUCCESS] Outbox delivered scan #{row_id}: {payload.get('item_name')}")
+        elif 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_STATUS:
+            # The API will never accept this payload; keep it for inspection
+            print(f"[WARNING] API rejected scan #{row_id} ({response.status_code}): {response.text[:200]}")
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'rejected', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts + 1, f"HTTP {response.status_code}", row_id),
+                )
+                self._conn.commit()
+        else:
+            self._retry(row_id, attempts, f"HTTP {response.status_code}")
+
+    def _delete(self, ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            self._conn.commit()
+
+    def _defer(self, ids, delay):
+        # API known to be down: wait for the breaker's probe window without
+        # counting it as a delivery attempt
+        next_at = time.time() + max(delay, 1.0)
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?", [(next_at, i) for i in ids]
+            )
+            self._conn.commit()
+
+    def _retry(self, row_id, attempts, error):
+        attempts += 1
+        backoff = min(self.max_backoff, 2 ** attempts) * random.uniform(0.8, 1.2)
+        print(f"[WARNING] Outbox delivery of scan #{row_id} failed ({error}); retry in {backoff:.0f}s")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, time.time() + backoff, error, row_id),
+            )
+            self._conn.commit()
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Return the process-wide outbox, starting its sender on first use."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                outbox = ScanOutbox(
+                    batch_size=int(os.environ.get('SCAN_BATCH_SIZE', 25)),
+                    batch_window_ms=int(os.environ.get('SCAN_BATCH_WINDOW_MS', 250)),
+                )
+                outbox.start()
+                _outbox = outbox
+    return _outbox
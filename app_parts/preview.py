@@ -0,0 +1,88 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+class PreviewThrottle:
+    """Rate-limited, downscaled JPEG preview for the scanner pages.
+
+    Decoding sees every frame; the browser only gets ``fps`` previews per
+    second, resized to ``width`` pixels and JPEG-encoded at
+    ``jpeg_quality`` (Streamlit forwards JPEG bytes as is instead of
+    PNG-encoding a full-resolution array). A preview is also skipped when
+    the scene and the detected codes are the same as in the last one shown.
+    """
+
+    def __init__(self, fps=10.0, width=480, jpeg_quality=70, thumb_size=(32, 24), change_threshold=3.0):
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.width = width
+        self.jpeg_quality = jpeg_quality
+        self.thumb_size = thumb_size
+        self.change_threshold = change_threshold
+        self._last_shown_at = 0.0
+        self._last_thumb = None
+        self._last_codes = None
+        self.shown = 0
+        self.skipped_rate = 0
+        self.skipped_unchanged = 0
+        self.bytes_sent = 0
+        self.encode_ms = 0.0
+
+    def wants(self, frame, decoded_objects):
+        """True if a preview of ``frame`` should be shown now (call before annotating)."""
+        now = time.monotonic()
+        if now - self._last_shown_at < self.interval:
+            self.skipped_rate += 1
+            return False
+        codes = frozenset(obj.data for obj in decoded_objects)
+        thumb = cv2.resize(frame, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if (
+            self._last_thumb is not None
+            and codes == self._last_codes
+            and float(np.mean(cv2.absdiff(thumb, self._last_thumb))) < self.change_threshold
+        ):
+            self.skipped_unchanged += 1
+            return False
+        self._last_thumb = thumb
+        self._last_codes = codes
+        self._last_shown_at = now
+        return True
+
+    def encode(self, frame):
+        """Downscale and JPEG-encode a BGR frame."""
+        h, w = frame.shape[:2]
+        if self.width and w > self.width:
+            frame = cv2.resize(frame, (self.width, int(h * self.width / w)), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+    def show(self, placeholder, frame):
+        """Encode the (annotated) BGR ``frame`` and push it to ``placeholder``."""
+        start = time.perf_counter()
+        data = self.encode(frame)
+        self.encode_ms += (time.perf_counter() - start) * 1000.0
+        placeholder.image(data, use_container_width=True)
+        self.shown += 1
+        self.bytes_sent += len(data)
+
+    def stats(self):
+        return {
+            'shown': self.shown,
+            'skipped_rate': self.skipped_rate,
+            'skipped_unchanged': self.skipped_unchanged,
+            'avg_kb': self.bytes_sent / self.shown / 1024 if self.shown else 0.0,
+            'avg_encode_ms': self.encode_ms / self.shown if self.shown else 0.0,
+        }
+
+
+def preview_from_env():
+    """``PreviewThrottle`` configured from ``PREVIEW_FPS`` (10), ``PREVIEW_WIDTH`` (480) and ``PREVIEW_JPEG_QUALITY`` (70)."""
+    return PreviewThrottle(
+        fps=float(os.environ.get('PREVIEW_FPS', 10)),
+        width=int(os.environ.get('PREVIEW_WIDTH', 480)),
+        jpeg_quality=int(os.environ.get('PREVIEW_JPEG_QUALITY', 70)),
+    )
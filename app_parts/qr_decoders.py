@@ -0,0 +1,528 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+
+# Same shape as pyzbar's Decoded results, so annotate_frame / the scan loops
+# work unchanged whatever backend produced them
+Point = namedtuple('Point', ['x', 'y'])
+Rect = namedtuple('Rect', ['left', 'top', 'width', 'height'])
+DecodedSymbol = namedtuple('DecodedSymbol', ['data', 'type', 'rect', 'polygon'])
+
+
+def _symbol_from_points(data, points, symbol_type='QRCODE'):
+    pts = [Point(int(round(x)), int(round(y))) for x, y in points]
+    xs = [p.x for p in pts]
+    ys = [p.y for p in pts]
+    rect = Rect(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+    return DecodedSymbol(data, symbol_type, rect, pts)
+
+
+class PyzbarDecoder:
+    """ZBar via pyzbar, restricted to the symbologies we print (QR only by default)."""
+
+    name = 'pyzbar'
+
+    def __init__(self, symbols=('QRCODE',)):
+        from pyzbar import pyzbar
+        self._pyzbar = pyzbar
+        self._symbols = [pyzbar.ZBarSymbol[s] for s in symbols]
+
+    def decode(self, image):
+        results = []
+        for obj in self._pyzbar.decode(image, symbols=self._symbols):
+            results.append(DecodedSymbol(
+                obj.data,
+                obj.type,
+                Rect(obj.rect.left, obj.rect.top, obj.rect.width, obj.rect.height),
+                [Point(p.x, p.y) for p in obj.polygon],
+            ))
+        return results
+
+
+class OpenCVDecoder:
+    """OpenCV's ``QRCodeDetector`` with multi-code detection."""
+
+    name = 'opencv'
+
+    def __init__(self):
+        self._detector = cv2.QRCodeDetector()
+        # Codes located in the last image but not decoded (lets a staged
+        # pipeline retry at higher resolution)
+        self.undecoded = 0
+
+    def decode(self, image):
+        ok, texts, points, _ = self._detector.detectAndDecodeMulti(image)
+        if not ok or points is None:
+            self.undecoded = 0
+            return []
+        self.undecoded = sum(1 for text in texts if not text)
+        return [
+            _symbol_from_points(text.encode('utf-8'), quad)
+            for text, quad in zip(texts, points)
+            if text
+        ]
+
+
+class OpenCVArucoDecoder(OpenCVDecoder):
+    """OpenCV's ArUco-based QR detector (OpenCV >= 4.8), more robust to blur and angle."""
+
+    name = 'opencv-aruco'
+
+    def __init__(self):
+        super().__init__()
+        self._detector = cv2.QRCodeDetectorAruco()
+
+
+DECODERS = {
+    PyzbarDecoder.name: PyzbarDecoder,
+    OpenCVDecoder.name: OpenCVDecoder,
+    OpenCVArucoDecoder.name: OpenCVArucoDecoder,
+}
+
+
+def create_decoder(name):
+    """Instantiate backend ``name``; raises if its dependencies are unavailable."""
+    if name not in DECODERS:
+        raise ValueError(f"Unknown QR decoder '{name}'. Available: {', '.join(DECODERS)}")
+    return DECODERS[name]()
+
+
+def available_decoders():
+    """Return ``{name: decoder}`` for every backend that can be created here."""
+    decoders = {}
+    for name in DECODERS:
+        try:
+            decoders[name] = create_decoder(name)
+        except Exception as e:
+            print(f"[WARNING] QR decoder '{name}' unavailable: {e}")
+    return decoders
+
+
+def _remap(symbol, scale, offset=(0, 0)):
+    """Map a symbol found on a resized/cropped image back to full-frame coordinates."""
+    ox, oy = offset
+    points = [((p.x / scale) + ox, (p.y / scale) + oy) for p in symbol.polygon]
+    return _symbol_from_points(symbol.data, points, symbol.type)
+
+
+class StageStats:
+    """Running per-stage timings and per-stage hit counts of staged decoding."""
+
+    STAGES = ('convert', 'downscale', 'decode_small', 'decode_full', 'decode_crop')
+    HIT_STAGES = ('decode_small', 'decode_full', 'decode_crop')
+
+    def __init__(self):
+        self.frames = 0
+        self._total = dict.fromkeys(self.STAGES, 0.0)
+        self._runs = dict.fromkeys(self.STAGES, 0)
+        self._hits = dict.fromkeys(self.HIT_STAGES, 0)
+
+    def add(self, stage, elapsed_ms):
+        self._total[stage] += elapsed_ms
+        self._runs[stage] += 1
+
+    def hit(self, stage):
+        self._hits[stage] += 1
+
+    def record(self, timings, hit_stage):
+        """Account one frame given its ``{stage: ms}`` timings and the stage that found codes."""
+        self.frames += 1
+        for stage, elapsed_ms in timings.items():
+            self.add(stage, elapsed_ms)
+        if hit_stage:
+            self.hit(hit_stage)
+
+    def snapshot(self):
+        """Per-stage ``{runs, avg_ms, total_ms}`` plus hits per decode stage and frames seen."""
+        stages = {
+            stage: {
+                'runs': self._runs[stage],
+                'avg_ms': self._total[stage] / self._runs[stage] if self._runs[stage] else 0.0,
+                'total_ms': self._total[stage],
+            }
+            for stage in self.STAGES
+        }
+        return {'frames': self.frames, 'stages': stages, 'hits': dict(self._hits)}
+
+
+class DecodePipeline:
+    """Staged decode around a backend, cheapest attempt first.
+
+    1. convert the BGR frame to grayscale once;
+    2. decode a copy downscaled by ``scale`` (most codes held up to the
+       camera are big enough to survive it);
+    3. if nothing was found, or the backend located codes it could not
+       read, decode the full-resolution grayscale image;
+    4. optionally, if still nothing, decode the centre crop upscaled by
+       ``crop_upscale`` (small or distant codes).
+
+    Symbols are returned in full-frame coordinates. ``stats()`` exposes the
+    running per-stage timings and which stage produced the hits.
+    """
+
+    def __init__(self, decoder, scale=0.75, crop_upscale=None):
+        self.decoder = decoder
+        self.name = decoder.name
+        self.scale = scale
+        self.crop_upscale = crop_upscale
+        self._stats = StageStats()
+        self.last_timings = {}
+        self.last_hit = None
+
+    def _timed(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.last_timings[stage] = (time.perf_counter() - start) * 1000.0
+        return result
+
+    def _downscale(self, gray):
+        return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def decode(self, image):
+        self.last_timings = {}
+        self.last_hit = None
+        found = self._decode(image)
+        self._stats.record(self.last_timings, self.last_hit)
+        return found
+
+    def _decode(self, image):
+        if image.ndim == 3:
+            gray = self._timed('convert', cv2.cvtColor, image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
+
+        if self.scale and self.scale < 1.0:
+            small = self._timed('downscale', self._downscale, gray)
+            small_found = self._timed('decode_small', self.decoder.decode, small)
+            if small_found:
+                small_found = [_remap(s, self.scale) for s in small_found]
+                if not getattr(self.decoder, 'undecoded', 0):
+                    self.last_hit = 'decode_small'
+                    return small_found
+        else:
+            small_found = []
+
+        found = self._timed('decode_full', self.decoder.decode, gray)
+        if found:
+            self.last_hit = 'decode_full'
+            return found
+        if small_found:
+            self.last_hit = 'decode_small'
+            return small_found
+
+        if self.crop_upscale and self.crop_upscale > 1.0:
+            h, w = gray.shape
+            x0, y0 = w // 4, h // 4
+            crop = gray[y0:y0 + h // 2, x0:x0 + w // 2]
+            big = cv2.resize(crop, None, fx=self.crop_upscale, fy=self.crop_upscale, interpolation=cv2.INTER_CUBIC)
+            found = self._timed('decode_crop', self.decoder.decode, big)
+            if found:
+                self.last_hit = 'decode_crop'
+                return [_remap(s, self.crop_upscale, (x0, y0)) for s in found]
+        return []
+
+    def stats(self):
+        """Per-stage ``{runs, avg_ms, total_ms}`` plus hits per decode stage and frames seen."""
+        return self._stats.snapshot()
+
+
+class RoiTracker:
+    """Decode around where codes were last seen before scanning the whole frame.
+
+    After a hit, the next frames are decoded on the bounding box of the last
+    polygons padded by ``pad`` (fraction of the box size, at least
+    ``min_pad`` pixels). The full frame is scanned when the ROI misses and
+    every ``full_every`` frames while tracking, so new codes entering the
+    view are still picked up.
+    """
+
+    def __init__(self, decoder, pad=0.5, min_pad=24, full_every=10):
+        self.decoder = decoder
+        self.name = decoder.name
+        self.pad = pad
+        self.min_pad = min_pad
+        self.full_every = full_every
+        self.roi = None
+        self._since_full = 0
+        self._counts = {'roi_hits': 0, 'roi_misses': 0, 'full_scans': 0}
+
+    def _roi_from(self, symbols, shape):
+        h, w = shape[:2]
+        xs = [p.x for s in symbols for p in s.polygon]
+        ys = [p.y for s in symbols for p in s.polygon]
+        x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+        px = max(self.min_pad, int((x1 - x0) * self.pad))
+        py = max(self.min_pad, int((y1 - y0) * self.pad))
+        return max(0, x0 - px), max(0, y0 - py), min(w, x1 + px), min(h, y1 + py)
+
+    def _full(self, image):
+        self._counts['full_scans'] += 1
+        self._since_full = 0
+        found = self.decoder.decode(image)
+        self.roi = self._roi_from(found, image.shape) if found else None
+        return found
+
+    def decode(self, image):
+        if self.roi is None or self._since_full + 1 >= self.full_every:
+            return self._full(image)
+
+        self._since_full += 1
+        x0, y0, x1, y1 = self.roi
+        found = self.decoder.decode(image[y0:y1, x0:x1])
+        if not found:
+            self._counts['roi_misses'] += 1
+            return self._full(image)
+        self._counts['roi_hits'] += 1
+        found = [_remap(s, 1.0, (x0, y0)) for s in found]
+        self.roi = self._roi_from(found, image.shape)
+        return found
+
+    def stats(self):
+        """Wrapped decoder's stats plus ROI hit/miss and full-scan counts."""
+        stats_fn = getattr(self.decoder, 'stats', None)
+        stats = dict(stats_fn()) if stats_fn else {}
+        stats['roi'] = dict(self._counts)
+        return stats
+
+
+class MotionGate:
+    """Skip decoding while the scene is static.
+
+    Each frame is shrunk to a ``thumb_size`` grayscale thumbnail and compared
+    with the thumbnail of the last decoded frame. Decode runs only when at
+    least ``changed_fraction`` of its pixels moved by more than
+    ``pixel_threshold`` grey levels, or when ``heartbeat`` seconds passed
+    since the last decode; otherwise the previous results are returned.
+    """
+
+    def __init__(self, decoder, thumb_size=(64, 48), pixel_threshold=20, changed_fraction=0.01, heartbeat=1.0):
+        self.decoder = decoder
+        self.name = decoder.name
+        self.thumb_size = thumb_size
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.heartbeat = heartbeat
+        self._reference = None
+        self._last_decode = 0.0
+        self._last_result = []
+        self._counts = {'decoded': 0, 'skipped': 0, 'heartbeats': 0}
+
+    def _thumbnail(self, image):
+        thumb = cv2.resize(image, self.thumb_size, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        return thumb
+
+    def decode(self, image):
+        thumb = self._thumbnail(image)
+        now = time.monotonic()
+        if self._reference is not None and self._reference.shape == thumb.shape:
+            diff = cv2.absdiff(thumb, self._reference)
+            changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            if changed < self.changed_fraction:
+                if now - self._last_decode < self.heartbeat:
+                    self._counts['skipped'] += 1
+                    return self._last_result
+                self._counts['heartbeats'] += 1
+
+        self._counts['decoded'] += 1
+        self._reference = thumb
+        self._last_decode = now
+        self._last_result = self.decoder.decode(image)
+        return self._last_result
+
+    def stats(self):
+        """Wrapped decoder's stats plus decoded/skipped/heartbeat frame counts."""
+        stats_fn = getattr(self.decoder, 'stats', None)
+        stats = dict(stats_fn()) if stats_fn else {}
+        stats['motion'] = dict(self._counts)
+        return stats
+
+
+def render_qr(text, size):
+    """Render ``text`` as a black-on-white QR code image of ``size`` x ``size`` pixels."""
+    code = cv2.QRCodeEncoder.create().encode(text)
+    return cv2.resize(code, (size, size), interpolation=cv2.INTER_NEAREST)
+
+
+def synthetic_frame(payloads, width=640, height=480, size=160, blur=0, rotation=0.0, rng=None):
+    """Compose a BGR camera-like frame with one QR code per payload.
+
+    Codes are placed left to right on a noisy grey background, optionally
+    rotated (degrees) and Gaussian-blurred (kernel radius in pixels).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    frame = rng.normal(170, 12, (height, width)).clip(0, 255).astype(np.uint8)
+    slot = width // max(1, len(payloads))
+    for i, text in enumerate(payloads):
+        code = render_qr(text, size)
+        if rotation:
+            pad = size // 3
+            code = cv2.copyMakeBorder(code, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=255)
+            center = (code.shape[1] / 2, code.shape[0] / 2)
+            matrix = cv2.getRotationMatrix2D(center, rotation, 1.0)
+            code = cv2.warpAffine(code, matrix, (code.shape[1], code.shape[0]), borderValue=255)
+        h, w = code.shape
+        if h > height or w > slot:
+            continue
+        x = i * slot + int(rng.integers(0, slot - w + 1))
+        y = int(rng.integers(0, height - h + 1))
+        frame[y:y + h, x:x + w] = code
+    if blur:
+        k = 2 * int(blur) + 1
+        frame = cv2.GaussianBlur(frame, (k, k), 0)
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+
+def synthetic_corpus(payloads, count=60, seed=0):
+    """Deterministic set of ``(frame, expected_payloads)`` with varied size/blur/rotation/count."""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for i in range(count):
+        n = 1 + i % 2
+        chosen = [payloads[int(j)] for j in rng.integers(0, len(payloads), n)]
+        frame = synthetic_frame(
+            chosen,
+            size=int(rng.integers(110, 200)) if n == 1 else int(rng.integers(110, 150)),
+            blur=int(rng.integers(0, 2)),
+            rotation=float(rng.uniform(-25, 25)),
+            rng=rng,
+        )
+        corpus.append((frame, set(chosen)))
+    return corpus
+
+
+def synthetic_hold_sequence(payload, count=60, drift=6, seed=0):
+    """Frames of one code held in front of the camera, drifting a few pixels per frame."""
+    rng = np.random.default_rng(seed)
+    base = synthetic_frame([payload], size=int(rng.integers(140, 200)), rotation=float(rng.uniform(-15, 15)), rng=rng)
+    sequence = []
+    dy = dx = 0
+    for _ in range(count):
+        dy += int(rng.integers(-drift, drift + 1))
+        dx += int(rng.integers(-drift, drift + 1))
+        sequence.append((np.roll(base, (dy, dx), axis=(0, 1)), {payload}))
+    return sequence
+
+
+def synthetic_static_sequence(count=60, noise=3.0, seed=0):
+    """Frames of an empty counter: one fixed scene plus per-frame sensor noise, no code expected."""
+    rng = np.random.default_rng(seed)
+    base = synthetic_frame([], rng=rng).astype(np.float32)
+    return [
+        ((base + rng.normal(0, noise, base.shape)).clip(0, 255).astype(np.uint8), set())
+        for _ in range(count)
+    ]
+
+
+def benchmark_decoders(corpus, decoders=None):
+    """Run each decoder over ``corpus`` (``(frame, expected_payloads or None)`` pairs).
+
+    Returns ``{name: stats}`` with decode rate (frames/s), latency p50/p95
+    (ms) and miss rate. For frames without an expected set (``None``, e.g.
+    recorded footage), a miss is a frame where nothing was decoded; an empty
+    set means no code is expected.
+    """
+    decoders = decoders if decoders is not None else available_decoders()
+    report = {}
+    for name, decoder in decoders.items():
+        latencies = []
+        misses = 0
+        for frame, expected in corpus:
+            start = time.perf_counter()
+            found = {obj.data.decode('utf-8', 'replace') for obj in decoder.decode(frame)}
+            latencies.append(time.perf_counter() - start)
+            if (expected is None and not found) or (expected is not None and not expected <= found):
+                misses += 1
+        total = sum(latencies)
+        latencies.sort()
+        report[name] = {
+            'frames': len(corpus),
+            'decode_rate': len(corpus) / total if total else 0.0,
+            'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+            'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+            'miss_rate': misses / len(corpus) if corpus else 0.0,
+        }
+    return report
+
+
+def pick_fastest(report, miss_tolerance=0.05):
+    """Fastest backend whose miss rate is within ``miss_tolerance`` of the most accurate one."""
+    if not report:
+        return None
+    best_miss = min(r['miss_rate'] for r in report.values())
+    accurate = {n: r for n, r in report.items() if r['miss_rate'] <= best_miss + miss_tolerance}
+    return max(accurate, key=lambda n: accurate[n]['decode_rate'])
+
+
+_selected_name = None
+_selected_lock = threading.Lock()
+
+_AUTO_PAYLOADS = [f"https://jsonplaceholder.typicode.com/posts/{i}" for i in range(1, 21)]
+
+
+def selected_decoder_name():
+    """Return the backend name chosen for this process.
+
+    ``QR_DECODER`` names a backend explicitly; ``auto`` (the default)
+    benchmarks every available backend on a small synthetic corpus once and
+    keeps the fastest accurate one.
+    """
+    global _selected_name
+    if _selected_name is None:
+        with _selected_lock:
+            if _selected_name is None:
+                choice = os.environ.get('QR_DECODER', 'auto').strip().lower()
+                if choice != 'auto':
+                    create_decoder(choice)
+                    _selected_name = choice
+                else:
+                    report = benchmark_decoders(synthetic_corpus(_AUTO_PAYLOADS, count=20))
+                    name = pick_fastest(report)
+                    if name is None:
+                        raise RuntimeError("No QR decoder backend is available")
+                    print(f"[SUCCESS] Selected QR decoder '{name}': "
+                          f"{report[name]['decode_rate']:.0f} frames/s, miss rate {report[name]['miss_rate']:.0%}")
+                    _selected_name = name
+    return _selected_name
+
+
+def select_decoder(motion_gate=True):
+    """Return a new motion-gated, ROI-tracking, staged pipeline around the selected backend.
+
+    Detectors are not shared across threads, so every caller gets its own
+    pipeline, unless ``QR_DECODE_WORKERS`` > 0: then the stateful gate and
+    tracker stay per caller and decoding goes to the shared process pool.
+    ``QR_DECODE_SCALE`` (default 0.75; 1 disables the downscaled attempt) and
+    ``QR_DECODE_CROP_UPSCALE`` (default off) tune the stages;
+    ``QR_ROI_FULL_EVERY`` (default 10; 0 disables tracking) sets how often a
+    tracked scene still gets a full-frame scan; ``QR_MOTION_FRACTION``
+    (default 0.01; 0 disables the gate) and ``QR_MOTION_HEARTBEAT`` (seconds,
+    default 1) tune the motion gate. The gate runs on wall-clock time, so
+    offline scans of recorded footage pass ``motion_gate=False``.
+    """
+    from .decode_pool import get_decode_pool
+    decoder = get_decode_pool()
+    if decoder is None:
+        crop_upscale = float(os.environ.get('QR_DECODE_CROP_UPSCALE', 0)) or None
+        decoder = DecodePipeline(
+            create_decoder(selected_decoder_name()),
+            scale=float(os.environ.get('QR_DECODE_SCALE', 0.75)),
+            crop_upscale=crop_upscale,
+        )
+    full_every = int(os.environ.get('QR_ROI_FULL_EVERY', 10))
+    if full_every > 0:
+        decoder = RoiTracker(decoder, full_every=full_every)
+    changed_fraction = float(os.environ.get('QR_MOTION_FRACTION', 0.01))
+    if motion_gate and changed_fraction > 0:
+        decoder = MotionGate(
+            decoder,
+            changed_fraction=changed_fraction,
+            heartbeat=float(os.environ.get('QR_MOTION_HEARTBEAT', 1.0)),
+        )
+    return decoder
@@ -0,0 +1,223 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+
+# One flagged burst: dimension ('item'/'user'/'station'), its key, when,
+# scans in the short window vs. what the key's own baseline predicts, and
+# how likely that many scans are under the baseline (both NaN for a key too
+# new to have a baseline)
+ScanAnomaly = namedtuple('ScanAnomaly', ['kind', 'key', 'ts', 'count', 'expected', 'p_value'])
+
+KIND_LABELS = {'item': 'Bebida', 'user': 'Usuario', 'station': 'Estación'}
+
+
+def _poisson_log_pmf(i, lam):
+    return -lam + i * math.log(lam) - math.lgamma(i + 1)
+
+
+def _poisson_sf(k, lam):
+    """P(X >= k) for X ~ Poisson(lam), in log space so large ``lam`` cannot underflow."""
+    if k <= 0:
+        return 1.0
+    if lam <= 0:
+        return 0.0
+    if k > lam:
+        return min(1.0, _poisson_tail(k, lam))
+    # k at or below the mean: sum the lower tail from where it is negligible
+    low = max(0, int(lam - 40 * math.sqrt(lam) - 40))
+    below = sum(math.exp(_poisson_log_pmf(i, lam)) for i in range(low, int(k)))
+    return max(0.0, 1.0 - below)
+
+
+def _poisson_tail(k, lam):
+    # Sum the upper tail directly where 1 - P(X < k) would lose all precision;
+    # terms shrink for k > lam, so stop once they no longer add anything
+    term = math.exp(_poisson_log_pmf(k, lam)) if lam > 0 else 0.0
+    tail = 0.0
+    i = k
+    limit = k + 1000 + 40 * math.sqrt(lam)
+    while term > tail * 1e-12 and i < limit:
+        tail += term
+        i += 1
+        term *= lam / i
+    return tail
+
+
+class _Rate:
+    """Exponentially decayed scan counts of one key over a short and a long horizon."""
+
+    __slots__ = ('first_ts', 'last_ts', 'short', 'long', 'alerted_at')
+
+    def __init__(self, ts):
+        self.first_ts = ts
+        self.last_ts = ts
+        self.short = 0.0
+        self.long = 0.0
+        self.alerted_at = None
+
+
+class ScanAnomalyDetector:
+    """Streaming burst detector for scan rates per item, user and station.
+
+    Each key keeps two exponentially decayed counters (time constants
+    ``short_window`` and ``long_window`` seconds) updated in O(1) per scan,
+    so memory is a few floats per key whatever the history length. A key is
+    flagged when its short-window count is at least ``min_scans``,
+    ``ratio`` times what its own long-run rate predicts, and that unlikely
+    under it: a Poisson tail probability below ``significance`` (kept low
+    because thousands of keys are tested on every scan). Keys younger than
+    ``long_window`` have no settled baseline yet, since a burst inflates it
+    too: new users and stations, whose rate one person or camera bounds
+    (unlike an item's, which grows with the fleet), are also flagged once
+    their short-window count reaches ``cold_start_scans``. A flagged key is
+    quiet for one ``short_window``. At most ``max_keys`` keys per dimension
+    are tracked; the least recently scanned are dropped first.
+    """
+
+    DIMENSIONS = ('item', 'user', 'station')
+    COLD_START_KINDS = ('user', 'station')
+
+    def __init__(self, short_window=300.0, long_window=21600.0, min_scans=5, ratio=3.0, significance=1e-6,
+                 cold_start_scans=30, max_keys=10000, max_alerts=50):
+        self.short_window = float(short_window)
+        self.long_window = float(long_window)
+        self.min_scans = min_scans
+        self.ratio = ratio
+        self.significance = significance
+        self.cold_start_scans = cold_start_scans
+        self.max_keys = max_keys
+        self._rates = {kind: OrderedDict() for kind in self.DIMENSIONS}
+        self._alerts = deque(maxlen=max_alerts)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_event_id = None
+        self.observed = 0
+        self.evicted = 0
+
+    def _update(self, kind, key, ts):
+        rates = self._rates[kind]
+        rate = rates.get(key)
+        if rate is None:
+            rate = rates[key] = _Rate(ts)
+            if len(rates) > self.max_keys:
+                rates.popitem(last=False)
+                self.evicted += 1
+        else:
+            rates.move_to_end(key)
+            # Events from several stations can arrive slightly out of order
+            dt = max(0.0, ts - rate.last_ts)
+            rate.short *= math.exp(-dt / self.short_window)
+            rate.long *= math.exp(-dt / self.long_window)
+        rate.short += 1.0
+        rate.long += 1.0
+        rate.last_ts = max(rate.last_ts, ts)
+
+        age = rate.last_ts - rate.first_ts
+        if rate.short < self.min_scans:
+            return None
+        if rate.alerted_at is not None and ts - rate.alerted_at < self.short_window:
+            return None
+        count = int(rate.short)
+        if age < self.long_window and count >= self.cold_start_scans and kind in self.COLD_START_KINDS:
+            rate.alerted_at = ts
+            return ScanAnomaly(kind, key, ts, count, math.nan, math.nan)
+        if age < self.short_window:
+            return None
+        # Long-run rate, corrected for keys younger than the long horizon
+        baseline = rate.long / (self.long_window * (1.0 - math.exp(-age / self.long_window)))
+        expected = baseline * self.short_window
+        if count < self.ratio * expected:
+            return None
+        p_value = _poisson_sf(count, expected)
+        if p_value >= self.significance:
+            return None
+        rate.alerted_at = ts
+        return ScanAnomaly(kind, key, ts, count, expected, p_value)
+
+    def observe(self, ts, item=None, user=None, station=None):
+        """Feed one scan; return the anomalies it triggered (usually none)."""
+        found = []
+        with self._lock:
+            self.observed += 1
+            for kind, key in (('item', item), ('user', user), ('station', station)):
+                if key is None:
+                    continue
+                anomaly = self._update(kind, key, ts)
+                if anomaly is not None:
+                    self._alerts.append(anomaly)
+                    found.append(anomaly)
+        return found
+
+    def sync(self, store, page='alcohol', chunk_size=1000):
+        """Feed the scan events ``store`` recorded for ``page`` since the last call.
+
+        Until an event has been consumed, only the last three
+        ``long_window`` are read (older events have decayed away); after that,
+        only rows with a higher id, so scans from every session and process
+        sharing the store are seen once.
+        """
+        found = []
+        with self._sync_lock:
+            start = time.time() - 3 * self.long_window if self._last_event_id is None else None
+            after_id = self._last_event_id or 0
+            while True:
+                events = store.events_after(after_id, limit=chunk_size, page=page, start=start)
+                for event in events:
+                    found.extend(self.observe(event['ts'], event['item_name'] or event['item_id'], event['user'],
+                                              event['station']))
+                if events:
+                    after_id = self._last_event_id = events[-1]['id']
+                if len(events) < chunk_size:
+                    return found
+
+    def recent(self, limit=10):
+        """Latest anomalies, newest first."""
+        with self._lock:
+            return list(reversed(self._alerts))[:limit]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'observed': self.observed,
+                'keys': {kind: len(rates) for kind, rates in self._rates.items()},
+                'evicted': self.evicted,
+                'alerts': len(self._alerts),
+            }
+
+
+def describe_anomaly(anomaly, window=300.0):
+    """Spanish one-line description for the alert panel (``window`` = the detector's ``short_window``)."""
+    normal = "sin historial previo" if math.isnan(anomaly.expected) else f"lo normal: {anomaly.expected:.1f}"
+    return (f"{KIND_LABELS.get(anomaly.kind, anomaly.kind)} **{anomaly.key}**: ~{anomaly.count} escaneos "
+            f"en ~{window / 60:.0f} min ({normal}) · "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(anomaly.ts))}")
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_anomaly_detector():
+    """Process-wide detector for alcohol scans, configured from the environment.
+
+    ``SCAN_ANOMALY_SHORT_WINDOW`` (300 s), ``SCAN_ANOMALY_LONG_WINDOW``
+    (21600 s), ``SCAN_ANOMALY_MIN_SCANS`` (5), ``SCAN_ANOMALY_RATIO`` (3), ``SCAN_ANOMALY_SIGNIFICANCE`` (1e-6),
+    ``SCAN_ANOMALY_COLD_START_SCANS`` (30), ``SCAN_ANOMALY_MAX_KEYS`` (10000 per dimension).
+    """
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = ScanAnomalyDetector(
+                    short_window=float(os.environ.get('SCAN_ANOMALY_SHORT_WINDOW', 300)),
+                    long_window=float(os.environ.get('SCAN_ANOMALY_LONG_WINDOW', 21600)),
+                    min_scans=int(os.environ.get('SCAN_ANOMALY_MIN_SCANS', 5)),
+                    ratio=float(os.environ.get('SCAN_ANOMALY_RATIO', 3)),
+                    significance=float(os.environ.get('SCAN_ANOMALY_SIGNIFICANCE', 1e-6)),
+                    cold_start_scans=int(os.environ.get('SCAN_ANOMALY_COLD_START_SCANS', 30)),
+                    max_keys=int(os.environ.get('SCAN_ANOMALY_MAX_KEYS', 10000)),
+                )
+    return _detector
@@ -0,0 +1,23 @@
+class ScanHistory:
+    """Session scan counters for one page: total scans and distinct items.
+
+    The scans themselves live in the ``ScanEventStore``; the session only
+    needs the counts shown in its metric tiles and the live caption.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._item_ids = set()
+
+    def add(self, result):
+        """Count a scan (``result`` is ``process_qr``'s result dict)."""
+        self.total += 1
+        self._item_ids.add(result.get('item_id', 'N/A'))
+
+    @property
+    def unique_item_ids(self):
+        return len(self._item_ids)
+
+    def clear(self):
+        self.total = 0
+        self._item_ids.clear()
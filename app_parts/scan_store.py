@@ -0,0 +1,324 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+
+# Scans per page in the Historial tabs
+HISTORY_PAGE_SIZE = 20
+
+
+def _default_db_path():
+    return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'scan_events.db')
+
+
+def date_bounds(dates):
+    """Epoch ``(start, end)`` covering the days of a ``st.date_input`` range (end exclusive)."""
+    dates = [d for d in (dates if isinstance(dates, (list, tuple)) else [dates]) if d is not None]
+    if not dates:
+        return None, None
+    start = datetime.combine(min(dates), dt_time.min)
+    end = datetime.combine(max(dates), dt_time.min) + timedelta(days=1)
+    return start.timestamp(), end.timestamp()
+
+
+def _hour_start(ts):
+    """Epoch of the start of the local hour containing ``ts``."""
+    return int(datetime.fromtimestamp(ts).replace(minute=0, second=0, microsecond=0).timestamp())
+
+
+def _day_start(day):
+    """Epoch of local midnight at the start of ``day`` (a ``date``)."""
+    return int(datetime.combine(day, dt_time.min).timestamp())
+
+
+def station_id():
+    """Name of this scanning station: ``STATION_ID`` or the host name."""
+    return os.environ.get('STATION_ID') or socket.gethostname()
+
+
+class ScanEventStore:
+    """Persistent log of processed scans, shared by every session and station.
+
+    One row per ``process_qr`` result in SQLite (WAL mode, so readers never
+    block the camera loops writing), indexed by time, item, user and
+    station. Several app processes on the same host can share the file;
+    rows carry the station that scanned them.
+
+    Per-hour and per-day scan counts per page and station are kept in
+    ``scan_rollups``, updated in the same transaction as each insert, so
+    volume panels read a handful of rows instead of counting events.
+    ``summary()`` and ``stations()`` are cached until a new event is stored
+    (by any process), since the Historial tabs ask for them on every rerun.
+    """
+
+    COLUMNS = ('id', 'ts', 'page', 'station', 'user', 'user_id', 'role', 'action', 'qr_code',
+               'item_id', 'item_name', 'item_url', 'category', 'status', 'outbox_id', 'api_error')
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or _default_db_path()
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._cache_version = None
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                page TEXT NOT NULL,
+                station TEXT NOT NULL,
+                user TEXT,
+                user_id TEXT,
+                role TEXT,
+                action TEXT,
+                qr_code TEXT,
+                item_id TEXT,
+                item_name TEXT,
+                item_url TEXT,
+                category TEXT,
+                status TEXT NOT NULL DEFAULT 'success',
+                outbox_id INTEGER,
+                api_error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_events_ts ON scan_events (ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_events_page ON scan_events (page, ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_events_item ON scan_events (item_id, ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_events_user ON scan_events (user, ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_events_station ON scan_events (station, ts)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_rollups (
+                period TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                page TEXT NOT NULL,
+                station TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (period, bucket, page, station)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+        self._backfill_rollups()
+
+    def _bump_rollups(self, ts, page, station, count=1):
+        hour = _hour_start(ts)
+        day = _day_start(datetime.fromtimestamp(ts).date())
+        self._conn.executemany(
+            "INSERT INTO scan_rollups (period, bucket, page, station, count) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (period, bucket, page, station) DO UPDATE SET count = count + excluded.count",
+            [('hour', hour, page, station, count), ('day', day, page, station, count)],
+        )
+
+    def _backfill_rollups(self):
+        """Build the rollups for a log written before they existed."""
+        with self._lock:
+            # Write lock first, so two processes opening the log cannot both backfill
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("SELECT 1 FROM scan_rollups LIMIT 1").fetchone():
+                self._conn.rollback()
+                return
+            # Same local hour/day buckets as _hour_start/_day_start, on whole
+            # seconds (SQLite rounds fractions to milliseconds). The hour start
+            # is found by stepping back, not by converting a local time to UTC,
+            # which would pick the wrong repeated hour when DST ends.
+            for period, bucket in (
+                ('hour', "s - 60 * CAST(strftime('%M', s, 'unixepoch', 'localtime') AS INTEGER)"
+                         " - CAST(strftime('%S', s, 'unixepoch', 'localtime') AS INTEGER)"),
+                ('day', "CAST(strftime('%s', s, 'unixepoch', 'localtime', 'start of day', 'utc') AS INTEGER)"),
+            ):
+                self._conn.execute(
+                    "INSERT INTO scan_rollups (period, bucket, page, station, count) "
+                    f"SELECT ?, {bucket} AS b, page, station, COUNT(*) "
+                    "FROM (SELECT CAST(ts AS INTEGER) AS s, page, station FROM scan_events) GROUP BY b, page, station",
+                    (period,),
+                )
+            rows = self._conn.execute("SELECT COALESCE(SUM(count), 0) FROM scan_rollups WHERE period = 'day'").fetchone()[0]
+            self._conn.commit()
+        if rows:
+            print(f"[DEBUG] Built scan rollups from {rows} stored events")
+
+    def record(self, result, page, station=None, status='success', ts=None):
+        """Store a ``process_qr`` result dict for ``page`` ('inventory', 'flight', 'alcohol'). Returns the row id."""
+        api = result.get('api_response') or {}
+        row = (
+            ts if ts is not None else time.time(),
+            page,
+            station or station_id(),
+            result.get('scanned_by'),
+            str(result.get('user_id')) if result.get('user_id') is not None else None,
+            result.get('role'),
+            result.get('action'),
+            result.get('qr_code'),
+            str(result['item_id']) if result.get('item_id') is not None else None,
+            result.get('item_name'),
+            result.get('item_url'),
+            result.get('category'),
+            status,
+            api.get('outbox_id'),
+            api.get('api_error'),
+        )
+        with self._lock:
+            self._bump_rollups(row[0], page, row[2])
+            cur = self._conn.execute(
+                "INSERT INTO scan_events (ts, page, station, user, user_id, role, action, qr_code, item_id, "
+                "item_name, item_url, category, status, outbox_id, api_error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._conn.commit()
+            return cur.lastrowid
+
+    @staticmethod
+    def _where(page=None, start=None, end=None, item_id=None, user=None, station=None):
+        clauses, params = [], []
+        for column, value in (('page', page), ('item_id', item_id), ('user', user), ('station', station)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=50, offset=0, **filters):
+        """Events matching ``filters``, newest first, as dicts.
+
+        Filters: ``page``, ``start``/``end`` (epoch seconds, end exclusive),
+        ``item_id``, ``user``, ``station``. ``limit=None`` returns all.
+        """
+        where, params = self._where(**filters)
+        sql = f"SELECT * FROM scan_events{where} ORDER BY ts DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def iter_events(self, chunk_size=5000, **filters):
+        """Yield the events matching ``filters`` newest first, ``chunk_size`` dicts at a time.
+
+        Reads through its own connection, so a long export never holds the
+        lock the camera loops write under.
+        """
+        where, params = self._where(**filters)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            cur = conn.execute(f"SELECT * FROM scan_events{where} ORDER BY ts DESC, id DESC", params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def events_after(self, after_id=0, limit=1000, **filters):
+        """Events with an id above ``after_id`` matching ``filters``, in insertion order (for incremental readers)."""
+        where, params = self._where(**filters)
+        where = f"{where} AND id > ?" if where else " WHERE id > ?"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM scan_events{where} ORDER BY id LIMIT ?", params + [int(after_id), int(limit)]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def item_history(self, item_id, start=None, end=None, limit=50, page=None):
+        """Scans of one item, newest first."""
+        return self.query(limit=limit, page=page, start=start, end=end, item_id=item_id)
+
+    def _cached(self, key, compute):
+        # Call under self._lock. The highest id changes with every insert,
+        # so it versions the cache across processes for one indexed lookup.
+        version = self._conn.execute("SELECT MAX(id) FROM scan_events").fetchone()[0]
+        if version != self._cache_version or len(self._cache) > 256:
+            self._cache.clear()
+            self._cache_version = version
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def summary(self, **filters):
+        """Totals for the events matching ``filters``: total, successful, unique items."""
+        where, params = self._where(**filters)
+
+        def compute():
+            total, successful, unique_items = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 'success'), 0), COUNT(DISTINCT item_id) "
+                f"FROM scan_events{where}",
+                params,
+            ).fetchone()
+            return {'total': total, 'successful': successful, 'unique_items': unique_items}
+
+        with self._lock:
+            return dict(self._cached(('summary', where, tuple(params)), compute))
+
+    def _rollup_counts(self, period, start, end, page=None, station=None):
+        clauses, params = ["period = ?", "bucket >= ?", "bucket < ?"], [period, start, end]
+        for column, value in (('page', page), ('station', station)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bucket, SUM(count) FROM scan_rollups WHERE {' AND '.join(clauses)} GROUP BY bucket",
+                params,
+            ).fetchall()
+        return dict(rows)
+
+    def day_count(self, day, page=None, station=None):
+        """Scans on ``day`` (a ``date``), from the daily rollup."""
+        start = _day_start(day)
+        return self._rollup_counts('day', start, start + 1, page, station).get(start, 0)
+
+    def hourly_counts(self, day, page=None, station=None):
+        """Scans in each local hour of ``day`` as a list of 24 counts, from the hourly rollup."""
+        start = _day_start(day)
+        counts = self._rollup_counts('hour', start, _day_start(day + timedelta(days=1)), page, station)
+        hours = [0] * 24
+        for bucket, count in counts.items():
+            hours[datetime.fromtimestamp(bucket).hour] += count
+        return hours
+
+    def stations(self, page=None):
+        """Stations that recorded events (for ``page``), sorted."""
+        where, params = self._where(page=page)
+
+        def compute():
+            rows = self._conn.execute(f"SELECT DISTINCT station FROM scan_events{where} ORDER BY station", params)
+            return [row[0] for row in rows.fetchall()]
+
+        with self._lock:
+            return list(self._cached(('stations', where, tuple(params)), compute))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_scan_store():
+    """Return the process-wide scan event store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ScanEventStore()
+    return _store
+
+
+def record_scan(result, page):
+    """Persist a ``process_qr`` result; a store failure never interrupts scanning."""
+    try:
+        return get_scan_store().record(result, page)
+    except Exception as e:
+        print(f"[ERROR] Could not store scan event: {e}")
+        return None
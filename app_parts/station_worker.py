@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+
+from .camera import FrameGrabber
+from .qr_decoders import select_decoder
+
+
+class StationWorker:
+    """Long-lived camera + decode loop for one scanning station.
+
+    Owns the ``FrameGrabber`` and a decoder and keeps decoding the newest
+    frame on a background thread, so the camera stays open across Streamlit
+    reruns and scanner restarts. The script thread only polls
+    ``next_result()`` and does the per-page work (catalog lookup,
+    ``process_qr``, display). Decoding pauses while nobody has polled for
+    ``active_window`` seconds, and the last result is dropped on pause so a
+    returning poller never gets a frame from before it.
+    """
+
+    def __init__(self, source=0, width=640, height=480, fps=30, active_window=2.0):
+        self.source = source
+        self.grabber = FrameGrabber(source, width=width, height=height, fps=fps)
+        self.decoder = select_decoder()
+        self.active_window = active_window
+        self.last_used = time.monotonic()
+        self._cond = threading.Condition()
+        self._latest = None
+        self._seq = 0
+        self._running = False
+        self._failed = False
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._running and not self._failed
+
+    def ensure_started(self):
+        """Open the camera and start decoding if not running yet. Returns False if the camera failed."""
+        with self._start_lock:
+            if self.is_running:
+                return True
+            if not self.grabber.start():
+                return False
+            self._running = True
+            self._failed = False
+            self._thread = threading.Thread(target=self._run, name=f"station-worker-{self.source}", daemon=True)
+            self._thread.start()
+            print(f"[SUCCESS] Station worker started for camera {self.source}")
+            return True
+
+    def _run(self):
+        while self._running:
+            if time.monotonic() - self.last_used > self.active_window:
+                # Nobody is watching: keep the camera open but stop decoding
+                if self._latest is not None:
+                    with self._cond:
+                        self._latest = None
+                time.sleep(0.05)
+                continue
+            ok, frame = self.grabber.read(timeout=1.0)
+            if not ok:
+                if self.grabber.failed:
+                    with self._cond:
+                        self._failed = True
+                        self._cond.notify_all()
+                    break
+                continue
+            try:
+                symbols = self.decoder.decode(frame)
+            except Exception as e:
+                print(f"[ERROR] Station worker decode failed: {e}")
+                symbols = []
+            with self._cond:
+                self._seq += 1
+                self._latest = (self._seq, frame, symbols)
+                self._cond.notify_all()
+
+    def next_result(self, after_seq=0, timeout=1.0):
+        """Return ``(seq, frame, symbols)`` newer than ``after_seq``, or ``None`` on timeout/camera failure."""
+        self.last_used = time.monotonic()
+        with self._cond:
+            self._cond.wait_for(
+                lambda: (self._latest is not None and self._seq > after_seq) or self._failed or not self._running,
+                timeout=timeout,
+            )
+            if self._latest is None or self._seq <= after_seq:
+                return None
+            return self._latest
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.grabber.release()
+        print(f"[DEBUG] Station worker for camera {self.source} stopped")
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+_reaper = None
+
+# Seconds a released worker waits for another session to poll it
+RELEASE_GRACE = 2.0
+
+
+def _idle_timeout():
+    return float(os.environ.get('STATION_IDLE_TIMEOUT', 60))
+
+
+def _reap_idle_workers():
+    while True:
+        time.sleep(5)
+        now = time.monotonic()
+        with _workers_lock:
+            idle = [key for key, w in _workers.items() if now - w.last_used > _idle_timeout()]
+            expired = [_workers.pop(key) for key in idle]
+        for worker in expired:
+            print(f"[DEBUG] Releasing idle camera {worker.source}")
+            worker.stop()
+
+
+def _usable(worker):
+    return worker is not None and (worker._thread is None or worker.is_running)
+
+
+def get_station_worker(source=0, **kwargs):
+    """Return the process-wide worker for camera ``source``, creating it on first use.
+
+    Workers unused for ``STATION_IDLE_TIMEOUT`` seconds (default 60) are
+    stopped and their camera released.
+    """
+    global _reaper
+    key = str(source)
+    with _workers_lock:
+        worker = _workers.get(key)
+        if _usable(worker):
+            worker.last_used = time.monotonic()
+            return worker
+
+    # Building the decoder can benchmark backends or start the decode pool:
+    # do it without holding up the other stations and the reaper
+    fresh = StationWorker(source, **kwargs)
+    replaced = None
+    with _workers_lock:
+        worker = _workers.get(key)
+        if not _usable(worker):
+            replaced = worker
+            worker = _workers[key] = fresh
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_idle_workers, name="station-worker-reaper", daemon=True)
+            _reaper.start()
+        worker.last_used = time.monotonic()
+    if replaced is not None:
+        replaced.stop()
+    return worker
+
+
+def release_station_worker(source=0):
+    """The user stopped the scanner: let the worker for ``source`` go unless other sessions use it.
+
+    The worker is only marked idle. Sessions still polling it keep it alive;
+    otherwise the reaper stops it and releases the camera within seconds.
+    """
+    with _workers_lock:
+        worker = _workers.get(str(source))
+        if worker is not None:
+            worker.last_used = time.monotonic() - _idle_timeout() + RELEASE_GRACE
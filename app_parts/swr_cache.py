@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ('value', 'has_value', 'fetched_at', 'error', 'error_at', 'refreshing')
+
+    def __init__(self):
+        self.value = None
+        self.has_value = False
+        self.fetched_at = 0.0
+        self.error = None
+        self.error_at = 0.0
+        self.refreshing = False
+
+
+class StaleWhileRevalidateCache:
+    """Process-wide TTL cache that serves the last good value immediately.
+
+    - Fresh values (younger than ``ttl``) are returned as is.
+    - Stale values are returned as is while one background thread refreshes
+      them.
+    - Failed loads are negatively cached for ``error_ttl`` seconds, so a
+      401/timeout is not retried on every rerun. The last good value keeps
+      being served meanwhile.
+
+    Only the very first load of a key blocks the caller.
+    """
+
+    def __init__(self, ttl=60.0, error_ttl=30.0, max_entries=256):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, default=None):
+        """Return the cached value for ``key``, calling ``loader()`` (which raises on failure) as needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+                entry.refreshing = True
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                load_now = True
+            else:
+                self._entries.move_to_end(key)
+                load_now = False
+                if not entry.refreshing and self._is_stale(entry, now):
+                    entry.refreshing = True
+                    threading.Thread(target=self._refresh, args=(key, entry, loader), daemon=True).start()
+
+        if load_now:
+            self._refresh(key, entry, loader)
+        return entry.value if entry.has_value else default
+
+    def _is_stale(self, entry, now):
+        if entry.error is not None and entry.error_at >= entry.fetched_at:
+            # Last attempt failed: back off until error_ttl has passed
+            return now - entry.error_at >= self.error_ttl
+        return not entry.has_value or now - entry.fetched_at >= self.ttl
+
+    def _refresh(self, key, entry, loader):
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"[WARNING] Refresh of cached '{key}' failed: {e}")
+            with self._lock:
+                entry.error = e
+                entry.error_at = time.monotonic()
+                entry.refreshing = False
+            return
+        with self._lock:
+            entry.value = value
+            entry.has_value = True
+            entry.fetched_at = time.monotonic()
+            entry.error = None
+            entry.refreshing = False
+
+    def status(self, key):
+        """Return ``(age_seconds, last_error)`` for ``key``, or ``(None, None)`` if never loaded."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.has_value:
+                return None, entry.error if entry else None
+            return time.monotonic() - entry.fetched_at, entry.error
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
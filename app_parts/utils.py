@@ -1,6 +1,7 @@
 
 import os
 import base64
+import functools
 import json
 import hashlib
 import re
@@ -18,6 +19,43 @@ def _img_data_uri(path, mime='png'):
         return None
 
 
+_ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_data_uri(path, mime, mtime_ns):
+    # mtime_ns is part of the key so a replaced image is re-encoded
+    return _img_data_uri(path, mime)
+
+
+def _static_serving_enabled():
+    try:
+        return bool(st.get_option('server.enableStaticServing'))
+    except Exception:
+        return False
+
+
+def logo_uri(stem):
+    """Return an <img> src for the logo ``stem`` (e.g. 'logo', 'logo2').
+
+    Looks in ``static/`` then ``assets/`` for a .png or .jpg. Files under
+    ``static/`` are referenced by URL when Streamlit static serving is on, so
+    reruns only send a short link (versioned by mtime for browser caching);
+    otherwise the image is base64-encoded once per process and reused.
+    """
+    for folder in ('static', 'assets'):
+        for ext, mime in (('png', 'png'), ('jpg', 'jpeg')):
+            path = os.path.join(_ROOT_DIR, folder, f"{stem}.{ext}")
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if folder == 'static' and _static_serving_enabled():
+                return f"app/static/{stem}.{ext}?v={mtime_ns:x}"
+            return _cached_data_uri(path, mime, mtime_ns)
+    return None
+
+
 def _users_file_path():
     return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets', 'users.json')
 
@@ -180,3 +218,99 @@ def navigate(page: str = None, sub: str = None, extra: dict = None):
         safe_rerun()
     except Exception:
         pass
+
+
+def render_api_status():
+    """Show the circuit breaker state and request timings of every backend endpoint used so far."""
+    try:
+        from .api_client import get_api_client
+        metrics = get_api_client().metrics()
+    except Exception:
+        return
+    labels = {'closed': 'conectada', 'open': 'sin conexión', 'half_open': 'reconectando'}
+    for endpoint, m in sorted(metrics.items()):
+        breaker = m.get('breaker', {})
+        state = breaker.get('state', 'closed')
+        if state == 'open':
+            st.warning(f"⚠️ API sin conexión (`/{endpoint}`) — usando datos locales. Reintento en {int(breaker['retry_in'])} s")
+        elif state == 'half_open':
+            st.info(f"🔄 Reconectando con la API (`/{endpoint}`)...")
+        st.caption(
+            f"🔌 `/{endpoint}`: {labels.get(state, state)} · {m['count']} llamadas, {m['errors']} errores"
+            + (f", {m['short_circuited']} evitadas" if m['short_circuited'] else "")
+            + (f" · {m['avg_ms']:.0f} ms de media, máx. {m['max_ms']:.0f} ms, última {m['last_ms']:.0f} ms"
+               if m['count'] else "")
+        )
+
+
+def render_decode_stats(decoder):
+    """Caption with the average time per decode stage of a scanner's pipeline."""
+    stats_fn = getattr(decoder, 'stats', None)
+    if stats_fn is None:
+        return
+    stats = stats_fn()
+    if not stats.get('frames'):
+        return
+    labels = {
+        'convert': 'gris',
+        'downscale': 'reducción',
+        'decode_small': 'decod. reducida',
+        'decode_full': 'decod. completa',
+        'decode_crop': 'decod. recorte',
+    }
+    parts = [
+        f"{label} {stats['stages'][stage]['avg_ms']:.1f} ms ×{stats['stages'][stage]['runs']}"
+        for stage, label in labels.items()
+        if stats['stages'][stage]['runs']
+    ]
+    hits = stats['hits']
+    st.caption(
+        f"⏱️ Decodificación ({decoder.name}, {stats['frames']} fotogramas): " + " · ".join(parts)
+        + f" — aciertos reducida/completa/recorte: {hits['decode_small']}/{hits['decode_full']}/{hits['decode_crop']}"
+    )
+    roi = stats.get('roi')
+    if roi:
+        st.caption(
+            f"🎯 Seguimiento de región: {roi['roi_hits']} aciertos en región, "
+            f"{roi['roi_misses']} fallos, {roi['full_scans']} escaneos completos"
+        )
+    motion = stats.get('motion')
+    if motion:
+        st.caption(
+            f"💤 Sin movimiento: {motion['skipped']} fotogramas sin decodificar, "
+            f"{motion['decoded']} decodificados ({motion['heartbeats']} de control)"
+        )
+    pool = stats.get('pool')
+    if pool:
+        st.caption(
+            f"🧵 Procesos de decodificación: {pool['workers']} · en curso {pool['in_flight']} · "
+            f"tiempos agotados {pool['timeouts']} · reinicios {pool['restarts']}"
+            + (" · ⚠️ decodificando en el proceso principal" if pool['broken'] else "")
+        )
+
+
+def render_preview_stats(preview):
+    """Caption with how many live previews were sent and how big they were."""
+    stats = preview.stats()
+    if not stats['shown']:
+        return
+    st.caption(
+        f"🖼️ Vista previa: {stats['shown']} enviadas ({stats['avg_kb']:.0f} KB, "
+        f"{stats['avg_encode_ms']:.1f} ms de codificación), omitidas {stats['skipped_rate']} por límite de FPS "
+        f"y {stats['skipped_unchanged']} sin cambios"
+    )
+
+
+def render_lookup_stats(scanner):
+    """Caption with the catalog lookup memo's hit/miss counters for a scanner."""
+    try:
+        stats = scanner.catalog.lookup_memo(type(scanner).__name__).stats()
+    except Exception:
+        return
+    total = stats['hits'] + stats['misses']
+    if not total:
+        return
+    st.caption(
+        f"🔎 Búsquedas en catálogo: {stats['hits']} desde caché, {stats['misses']} resueltas "
+        f"({stats['hits'] / total:.0%} aciertos, {stats['size']}/{stats['maxsize']} entradas)"
+    )
@@ -0,0 +1,74 @@
+"""Throughput and memory bound of the streaming scan anomaly detector.
+
+Replays a synthetic day of scans from many stations (each with a few users
+and a shared bottle catalog, Poisson arrivals) through
+``ScanAnomalyDetector.observe`` and reports microseconds per scan, tracked
+keys and alerts. A handful of injected bursts should be the only alerts.
+
+Usage:
+    python benchmarks/bench_anomaly.py --stations 2000 --scans-per-hour 20 --hours 8
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_parts.scan_anomaly import ScanAnomalyDetector  # noqa: E402
+
+
+def synthetic_scans(stations, scans_per_hour, hours, items, bursts, seed=0):
+    """Time-ordered ``(ts, item, user, station)`` tuples plus ``bursts`` injected bursts."""
+    rng = np.random.default_rng(seed)
+    total = int(stations * scans_per_hour * hours)
+    ts = np.sort(rng.uniform(0, hours * 3600, total))
+    station = rng.integers(0, stations, total)
+    user = station * 4 + rng.integers(0, 4, total)
+    item = rng.integers(0, items, total)
+    scans = [(float(t), f"item{i}", f"user{u}", f"station{s}") for t, i, u, s in zip(ts, item, user, station)]
+    # One user at a random station scanning a bottle every 6 s for 2 minutes
+    for b in range(bursts):
+        s = int(rng.integers(0, stations))
+        start = float(rng.uniform(hours * 1800, hours * 3600 - 300))
+        scans += [(start + 6 * k, f"item{b}", f"user{s * 4}", f"station{s}") for k in range(20)]
+    scans.sort()
+    return scans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=2000)
+    parser.add_argument('--scans-per-hour', type=float, default=20, help="per station")
+    parser.add_argument('--hours', type=float, default=8)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--bursts', type=int, default=5)
+    parser.add_argument('--max-keys', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    scans = synthetic_scans(args.stations, args.scans_per_hour, args.hours, args.items, args.bursts)
+    print(f"{len(scans)} scans, {args.stations} stations, {args.stations * 4} users, {args.items} items")
+
+    detector = ScanAnomalyDetector(max_keys=args.max_keys)
+    tracemalloc.start()
+    start = time.perf_counter()
+    alerts = []
+    for ts, item, user, station in scans:
+        alerts.extend(detector.observe(ts, item, user, station))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = detector.stats()
+    print(f"  {elapsed / len(scans) * 1e6:.1f} us/scan ({len(scans) / elapsed:,.0f} scans/s)")
+    print(f"  keys tracked {stats['keys']}, evicted {stats['evicted']}, peak detector memory {peak / 1024 / 1024:.1f} MiB")
+    print(f"  {len(alerts)} alerts ({args.bursts} bursts injected)")
+    for a in alerts[:10]:
+        print(f"    {a.kind:8} {a.key:14} count={a.count:3d} expected={a.expected:5.2f} p={a.p_value:.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Decode throughput of the worker-process pool versus in-process decoding.
+
+Feeds the same synthetic frames to an in-process ``DecodePipeline`` and to
+``DecodePool`` with 1..N workers, keeping every shared-memory slot busy, and
+reports frames/s and the speed-up over in-process decoding. Throughput
+should scale with cores until the pool has one worker per core.
+
+Usage:
+    python benchmarks/bench_decode_pool.py --frames 200 --max-workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_parts.decode_pool import DecodePool  # noqa: E402
+from app_parts.qr_decoders import DecodePipeline, create_decoder, selected_decoder_name, synthetic_corpus  # noqa: E402
+
+
+def bench_in_process(corpus, backend):
+    pipeline = DecodePipeline(create_decoder(backend))
+    start = time.perf_counter()
+    for frame, _ in corpus:
+        pipeline.decode(frame)
+    return time.perf_counter() - start
+
+
+def bench_pool(corpus, backend, workers):
+    pool = DecodePool(workers, backend=backend)
+    try:
+        # Warm up: wait until every worker has imported OpenCV and decoded once
+        for future in [pool.submit(corpus[i % len(corpus)][0]) for i in range(workers)]:
+            future.result(timeout=60)
+        in_flight = deque()
+        start = time.perf_counter()
+        for frame, _ in corpus:
+            if len(in_flight) >= pool.slot_count:
+                in_flight.popleft().result()
+            in_flight.append(pool.submit(frame))
+        while in_flight:
+            in_flight.popleft().result()
+        return time.perf_counter() - start
+    finally:
+        pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--backend', default=None, help="decoder backend (default: QR_DECODER selection)")
+    args = parser.parse_args(argv)
+
+    backend = args.backend or selected_decoder_name()
+    payloads = [f"https://jsonplaceholder.typicode.com/posts/{i}" for i in range(1, 101)]
+    corpus = synthetic_corpus(payloads, args.frames)
+
+    print(f"{args.frames} frames, backend {backend}, {os.cpu_count()} CPUs")
+    base = bench_in_process(corpus, backend)
+    print(f"  {'in-process':<12} {args.frames / base:7.1f} frames/s")
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = bench_pool(corpus, backend, workers)
+        print(f"  {f'{workers} workers':<12} {args.frames / elapsed:7.1f} frames/s   x{base / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
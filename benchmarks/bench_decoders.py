@@ -0,0 +1,115 @@
+"""QR decode backends compared on synthetic and (optionally) recorded frames.
+
+Synthetic frames carry one or two catalog-style QR codes with varied size,
+blur and rotation, so misses are exact. ``--source`` adds frames from any
+frame source (image folder, video file or a ``synthetic:...`` spec).
+Recorded frames have no ground truth: a miss is a frame where nothing was
+decoded, so only record frames that show a code.
+
+Each backend is also run through the staged pipeline (grayscale, then a
+``--scale`` downscaled attempt, then full resolution) and its per-stage
+timings are printed. A "held item" sequence (one code drifting a few
+pixels per frame) compares the pipeline with and without ROI tracking, and
+an "empty counter" sequence (static scene, sensor noise only) shows what the
+motion gate saves; its heartbeat is time based, so it fires less often here
+than at a live 30 fps.
+
+Usage:
+    python benchmarks/bench_decoders.py --frames 200
+    python benchmarks/bench_decoders.py --source recordings/station-3
+    python benchmarks/bench_decoders.py --source "synthetic:codes=2,size=110-150,blur=0-2"
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_parts.frame_sources import SyntheticSource, open_source  # noqa: E402
+from app_parts.qr_decoders import (  # noqa: E402
+    DecodePipeline, MotionGate, RoiTracker, available_decoders, benchmark_decoders, create_decoder, pick_fastest,
+    synthetic_corpus, synthetic_hold_sequence, synthetic_static_sequence,
+)
+
+
+def load_source(spec, limit):
+    """Up to ``limit`` frames of a frame source, with ground truth for synthetic ones."""
+    source = open_source(spec, realtime=False)
+    corpus = []
+    try:
+        while len(corpus) < limit:
+            ok, frame = source.read()
+            if not ok:
+                break
+            expected = set(source.last_payloads) if isinstance(source, SyntheticSource) else None
+            corpus.append((frame, expected))
+    finally:
+        source.release()
+    return corpus
+
+
+def print_report(title, report):
+    print(title)
+    for name, r in sorted(report.items(), key=lambda kv: -kv[1]['decode_rate']):
+        print(f"  {name:<22} {r['decode_rate']:7.1f} frames/s   p50 {r['p50_ms']:6.1f} ms   "
+              f"p95 {r['p95_ms']:6.1f} ms   miss {r['miss_rate']:6.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200, help="number of synthetic frames")
+    parser.add_argument('--source', help="extra frame source: image folder, video file or synthetic:... spec")
+    parser.add_argument('--source-frames', type=int, default=300, help="max frames read from --source")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scale', type=float, default=0.75, help="pipeline downscale factor")
+    parser.add_argument('--crop-upscale', type=float, default=None, help="pipeline centre-crop upscale factor")
+    args = parser.parse_args(argv)
+
+    decoders = available_decoders()
+    raw = dict(decoders)
+    pipelines = {}
+    for name in raw:
+        pipelines[name] = DecodePipeline(create_decoder(name), scale=args.scale, crop_upscale=args.crop_upscale)
+        decoders[f"{name}+pipeline"] = pipelines[name]
+
+    payloads = [f"https://jsonplaceholder.typicode.com/posts/{i}" for i in range(1, 101)]
+    synthetic = benchmark_decoders(synthetic_corpus(payloads, args.frames, args.seed), decoders)
+    print_report(f"synthetic, {args.frames} frames", synthetic)
+    if args.source:
+        extra = load_source(args.source, args.source_frames)
+        print_report(f"{len(extra)} frames from {args.source}", benchmark_decoders(extra, decoders))
+
+    print(f"pipeline stages (scale {args.scale}), all runs")
+    for name, pipeline in pipelines.items():
+        stats = pipeline.stats()
+        stages = "   ".join(
+            f"{stage} {s['avg_ms']:.1f} ms x{s['runs']}" for stage, s in stats['stages'].items() if s['runs']
+        )
+        print(f"  {name:<14} {stages}   hits {stats['hits']}")
+    held = []
+    for i in range(args.frames // 60 or 1):
+        held.extend(synthetic_hold_sequence(payloads[i], 60, seed=args.seed + i))
+    tracked = {}
+    for name in raw:
+        tracked[f"{name}+pipeline"] = DecodePipeline(create_decoder(name), scale=args.scale)
+        tracked[f"{name}+roi"] = RoiTracker(DecodePipeline(create_decoder(name), scale=args.scale))
+    print_report(f"held item, {len(held)} frames", benchmark_decoders(held, tracked))
+    for name, decoder in tracked.items():
+        if 'roi' in decoder.stats():
+            print(f"  {name:<22} {decoder.stats()['roi']}")
+
+    static = synthetic_static_sequence(max(args.frames, 60), seed=args.seed)
+    gated = {}
+    for name in raw:
+        gated[f"{name}+pipeline"] = DecodePipeline(create_decoder(name), scale=args.scale)
+        gated[f"{name}+motion"] = MotionGate(DecodePipeline(create_decoder(name), scale=args.scale))
+    print_report(f"empty counter, {len(static)} frames", benchmark_decoders(static, gated))
+    for name, decoder in gated.items():
+        if 'motion' in decoder.stats():
+            print(f"  {name:<22} {decoder.stats()['motion']}")
+
+    print(f"fastest accurate backend (QR_DECODER=auto would pick): {pick_fastest({n: synthetic[n] for n in raw})}")
+
+
+if __name__ == '__main__':
+    main()
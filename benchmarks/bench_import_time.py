@@ -0,0 +1,65 @@
+"""Cold-start cost of the access (login) screen.
+
+Each run starts a fresh interpreter, renders ``gategroupDashboard.py`` once
+with Streamlit's AppTest harness (no query params, nobody logged in) and
+reports the first-paint time plus which heavy modules the app imported
+(modules Streamlit itself already loaded are not counted).
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['cv2', 'numpy', 'pyzbar', 'pandas', 'plotly']
+
+_CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+heavy = sys.argv[2].split(",")
+preloaded = {m for m in heavy if m in sys.modules}
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+t2 = time.perf_counter()
+print(json.dumps({
+    "harness_s": t1 - t0,
+    "first_paint_s": t2 - t1,
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded": [m for m in heavy if m in sys.modules and m not in preloaded],
+}))
+'''
+
+
+def run_once(app_path):
+    out = subprocess.run(
+        [sys.executable, '-c', _CHILD, app_path, ','.join(HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--app', default=os.path.join(ROOT, 'gategroupDashboard.py'))
+    args = parser.parse_args(argv)
+
+    results = [run_once(args.app) for _ in range(args.runs)]
+    paints = [r['first_paint_s'] for r in results]
+    print(f"access screen, {args.runs} cold runs")
+    print(f"  first paint  median {statistics.median(paints) * 1000:7.0f} ms   min {min(paints) * 1000:7.0f} ms")
+    print(f"  heavy modules loaded: {', '.join(results[-1]['loaded']) or 'none'}")
+    if results[-1]['exceptions']:
+        print(f"  script exceptions: {results[-1]['exceptions']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Scan upload throughput against a local stand-in for the /api/scanner endpoint.
+
+Compares the old path (one bare ``requests.post`` per scan, new connection
+each time) with the outbox sender, unbatched and batched.
+
+Usage:
+    python benchmarks/bench_scan_upload.py --scans 500 --latency-ms 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_parts.api_client import ApiClient  # noqa: E402
+from app_parts.outbox import ScanOutbox  # noqa: E402
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    received = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        data = json.loads(body or b'{}')
+        count = len(data['events']) if self.path.endswith('/batch') else 1
+        time.sleep(self.latency)
+        with _StandInHandler.lock:
+            _StandInHandler.received += count
+        payload = json.dumps({"ok": True, "received": count}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def _payload(i):
+    return {
+        "qr_code": f"https://jsonplaceholder.typicode.com/posts/{i}",
+        "item_url": f"https://jsonplaceholder.typicode.com/posts/{i}",
+        "item_name": f"Item {i}",
+        "item_id": str(i),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "scanned_by": "bench",
+        "user_id": "bench",
+        "role": "Ground Crew",
+        "action": "inventory_scan",
+    }
+
+
+def bench_legacy(endpoint, scans):
+    start = time.perf_counter()
+    for i in range(scans):
+        requests.post(endpoint, json=_payload(i), headers={"Content-Type": "application/json"}, timeout=5)
+    return time.perf_counter() - start
+
+
+def bench_outbox(base_url, scans, batch_size, window_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = ScanOutbox(
+            os.path.join(tmp, 'outbox.db'),
+            batch_size=batch_size,
+            batch_window_ms=window_ms,
+            client=ApiClient(base_url),
+        )
+        try:
+            start = time.perf_counter()
+            for i in range(scans):
+                outbox.enqueue('scanner', _payload(i))
+            outbox.start()
+            while outbox.stats()['pending']:
+                time.sleep(0.01)
+            return time.perf_counter() - start
+        finally:
+            # Stop the sender before the temporary database is deleted
+            outbox.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scans', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="server-side latency per request")
+    parser.add_argument('--batch-size', type=int, default=25)
+    parser.add_argument('--window-ms', type=int, default=250)
+    args = parser.parse_args(argv)
+
+    _StandInHandler.latency = args.latency_ms / 1000.0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    endpoint = f"{base_url}/scanner"
+
+    runs = [
+        ("legacy requests.post", lambda: bench_legacy(endpoint, args.scans)),
+        ("outbox, unbatched", lambda: bench_outbox(base_url, args.scans, 1, 0)),
+        (f"outbox, batch {args.batch_size}/{args.window_ms}ms",
+         lambda: bench_outbox(base_url, args.scans, args.batch_size, args.window_ms)),
+    ]
+    print(f"{args.scans} scans, {args.latency_ms:.0f} ms server latency")
+    for label, run in runs:
+        elapsed = run()
+        print(f"  {label:<28} {elapsed:7.2f} s  {args.scans / elapsed:9.1f} scans/s")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,24 @@
 import streamlit as st
-import pandas as pd
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import base64
+import importlib
 import json
 import hashlib
 import re
 from datetime import datetime
-import requests
 import time
 from app_parts.login_page import render_login
 from app_parts.flightcrew_home import render_flightcrew
 from app_parts.groundcrew_home import render_groundcrew
+from app_parts.utils import logo_uri
 
-# Subpage modules (standalone)
-from app_parts.flight_alcohol import render as render_flight_alcohol
-from app_parts.flight_inventory import render as render_flight_inventory
-from app_parts.flight_training import render as render_flight_training
-from app_parts.ground_alcohol import render as render_ground_alcohol
-from app_parts.ground_inventory import render as render_ground_inventory
-from app_parts.ground_training import render as render_ground_training
+
+def _render_subpage(module_name):
+    """Import a standalone subpage module on demand and render it.
+
+    The scanner subpages pull in OpenCV, numpy, pyzbar and pandas; importing
+    them lazily keeps those out of the access screen's cold start.
+    """
+    importlib.import_module(f"app_parts.{module_name}").render()
 
 # Page configuration
 st.set_page_config(
@@ -245,36 +242,14 @@ IS_STANDALONE = IS_STANDALONE_FLIGHTCREW or IS_STANDALONE_GROUNDCREW
 # Configuration toggles
 # When True, FlightCrew UI is publicly accessible without logging in
 PUBLIC_FLIGHTCREW_ACCESS = False
-# Logo display (centered). The app will use `assets/logo.png` or `assets/logo.jpg` if present.
+# Logo display (centered). The app will use `static/logo.png` (or `assets/logo.png` / `.jpg`) if present.
 col_l, col_c, col_r = st.columns([1, 2, 1])
 with col_c:
-    assets_dir = os.path.join(os.path.dirname(__file__), 'assets')
-    assets_logo_path = os.path.join(assets_dir, 'logo.png')
-    assets_logo_jpg = os.path.join(assets_dir, 'logo.jpg')
-
-    def _img_data_uri(path, mime='png'):
-        try:
-            with open(path, 'rb') as f:
-                data = f.read()
-                b64 = base64.b64encode(data).decode('utf-8')
-                return f"data:image/{mime};base64,{b64}"
-        except Exception:
-            return None
-
-    # Support two persistent logos: logo.png (primary) and logo2.png (secondary)
-    uri1 = None
-    uri2 = None
-    if os.path.exists(assets_logo_path):
-        uri1 = _img_data_uri(assets_logo_path, 'png')
-    elif os.path.exists(assets_logo_jpg):
-        uri1 = _img_data_uri(assets_logo_jpg, 'jpeg')
-
-    assets_logo2_path = os.path.join(assets_dir, 'logo2.png')
-    assets_logo2_jpg = os.path.join(assets_dir, 'logo2.jpg')
-    if os.path.exists(assets_logo2_path):
-        uri2 = _img_data_uri(assets_logo2_path, 'png')
-    elif os.path.exists(assets_logo2_jpg):
-        uri2 = _img_data_uri(assets_logo2_jpg, 'jpeg')
+    # Support two persistent logos: logo (primary) and logo2 (secondary).
+    # logo_uri returns a static URL (or a once-per-process data URI) so
+    # reruns don't re-encode and resend the images.
+    uri1 = logo_uri('logo')
+    uri2 = logo_uri('logo2')
 
     if uri1 or uri2:
         # show both logos side-by-side when available
@@ -300,22 +275,22 @@ if IS_STANDALONE_FLIGHTCREW or IS_STANDALONE_GROUNDCREW:
         sub = (_sub or '').lower()
         if IS_STANDALONE_FLIGHTCREW:
             if sub == 'alcohol':
-                render_flight_alcohol()
+                _render_subpage('flight_alcohol')
             elif sub in ('inventario', 'inventory', 'inv'):
-                render_flight_inventory()
+                _render_subpage('flight_inventory')
             elif sub in ('entrenamiento', 'training', 'trn'):
-                render_flight_training()
+                _render_subpage('flight_training')
             else:
                 # Unknown subpage: fall back to flightcrew home
                 render_flightcrew(uri1, uri2)
         else:
             # groundcrew subpages
             if sub == 'alcohol':
-                render_ground_alcohol()
+                _render_subpage('ground_alcohol')
             elif sub in ('inventario', 'inventory', 'inv'):
-                render_ground_inventory()
+                _render_subpage('ground_inventory')
             elif sub in ('entrenamiento', 'training', 'trn'):
-                render_ground_training()
+                _render_subpage('ground_training')
             else:
                 render_groundcrew(uri1, uri2)
     else:
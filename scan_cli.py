@@ -0,0 +1,139 @@
+"""Headless batch scan of recorded footage.
+
+Runs the inventory or alcohol scanner pipeline (decode + catalog lookup)
+over a video file, a folder of images or a synthetic frame source as fast
+as possible, and writes one scan event per detected code to CSV or Parquet
+(Parquet needs ``pyarrow``). Nothing is sent to the API.
+
+A code is recorded again only after ``--cooldown`` seconds of footage
+without it, like the live scanner's cooldown, so an item held in front of
+the camera for two seconds is one event.
+
+Usage:
+    python scan_cli.py recordings/shift-0412.mp4 -o scans.csv
+    python scan_cli.py recordings/frames/ --scanner alcohol -o alcohol.parquet
+    python scan_cli.py "synthetic:count=3000,hold=30" -o /dev/null
+"""
+import argparse
+import importlib.util
+import os
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(ROOT, "data", "inventory.csv")
+
+EVENT_COLUMNS = [
+    'frame', 'source_time_s', 'qr_data', 'status', 'item_id', 'item_name', 'item_url', 'error',
+]
+
+
+def _make_scanner(kind, csv_path):
+    if kind == 'alcohol':
+        from app_parts.ground_alcohol import QRAlcoholScanner
+        return QRAlcoholScanner(csv_path)
+    from app_parts.ground_inventory import QRInventoryScanner
+    return QRInventoryScanner(csv_path)
+
+
+def scan_source(spec, kind='inventory', csv_path=DEFAULT_CSV, cooldown=2.0, fps=30.0, max_frames=None):
+    """Scan every frame of ``spec``; return ``(events, stats)``.
+
+    ``events`` is a list of dicts with ``EVENT_COLUMNS``; ``stats`` has the
+    frame count and the time spent reading frames vs. decoding + lookup.
+    """
+    from app_parts.frame_sources import open_source
+    from app_parts.qr_decoders import select_decoder
+
+    scanner = _make_scanner(kind, csv_path)
+    # No motion gate: its heartbeat counts wall-clock time, not footage time
+    decoder = select_decoder(motion_gate=False)
+    source = open_source(spec, realtime=False)
+    if not source.isOpened():
+        raise RuntimeError(f"Could not open frame source {spec!r}")
+    fps = getattr(source, 'native_fps', 0) or fps
+
+    events = []
+    last_seen = {}
+    frames = 0
+    read_s = scan_s = 0.0
+    try:
+        while max_frames is None or frames < max_frames:
+            start = time.perf_counter()
+            ok, frame = source.read()
+            read_s += time.perf_counter() - start
+            if not ok:
+                break
+            source_time = frames / fps
+
+            start = time.perf_counter()
+            for obj in decoder.decode(frame):
+                qr_data = obj.data.decode('utf-8', 'replace')
+                previous = last_seen.get(qr_data)
+                last_seen[qr_data] = source_time
+                if previous is not None and source_time - previous < cooldown:
+                    continue
+                item, error = scanner.get_item_from_qr(qr_data)
+                events.append({
+                    'frame': frames,
+                    'source_time_s': round(source_time, 3),
+                    'qr_data': qr_data,
+                    'status': 'success' if item else 'not_found',
+                    'item_id': item.get('id') if item else None,
+                    'item_name': item.get('name') if item else None,
+                    'item_url': item.get('url') if item else None,
+                    'error': error,
+                })
+            scan_s += time.perf_counter() - start
+            frames += 1
+    finally:
+        source.release()
+
+    return events, {'frames': frames, 'read_s': read_s, 'scan_s': scan_s}
+
+
+def write_events(events, path):
+    """Write events to ``path``: Parquet for ``.parquet``/``.pq`` (needs pyarrow), CSV otherwise."""
+    df = pd.DataFrame(events, columns=EVENT_COLUMNS)
+    if path.lower().endswith(('.parquet', '.pq')):
+        if importlib.util.find_spec('pyarrow') is None:
+            raise SystemExit("[ERROR] Writing Parquet requires pyarrow: pip install pyarrow")
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return len(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help="video file, image folder or synthetic:... spec")
+    parser.add_argument('-o', '--output', default='scans.csv', help="output .csv or .parquet")
+    parser.add_argument('--scanner', choices=['inventory', 'alcohol'], default='inventory')
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="inventory catalog CSV")
+    parser.add_argument('--cooldown', type=float, default=2.0, help="seconds of footage before a code counts again")
+    parser.add_argument('--fps', type=float, default=30.0, help="frame rate for sources without one (image folders)")
+    parser.add_argument('--max-frames', type=int, default=None)
+    parser.add_argument('--decoder', help="QR decode backend (overrides QR_DECODER)")
+    args = parser.parse_args(argv)
+
+    if args.decoder:
+        os.environ['QR_DECODER'] = args.decoder
+
+    start = time.perf_counter()
+    events, stats = scan_source(args.source, args.scanner, args.csv, args.cooldown, args.fps, args.max_frames)
+    elapsed = time.perf_counter() - start
+    written = write_events(events, args.output)
+
+    frames = stats['frames']
+    found = sum(1 for e in events if e['status'] == 'success')
+    print(f"[SUCCESS] {frames} frames in {elapsed:.2f}s ({frames / elapsed if elapsed else 0:.1f} frames/s)")
+    if frames:
+        print(f"  decode + lookup {stats['scan_s'] / frames * 1000:.1f} ms/frame "
+              f"({frames / stats['scan_s'] if stats['scan_s'] else 0:.1f} frames/s), "
+              f"read {stats['read_s'] / frames * 1000:.1f} ms/frame")
+    print(f"  {written} scan events ({found} matched the catalog) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
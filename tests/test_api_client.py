@@ -0,0 +1,96 @@
+import pytest
+import requests
+
+from app_parts import api_client
+from app_parts.api_client import ApiClient, CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(api_client.time, 'monotonic', clock)
+    return clock
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _FakeSession:
+    """Answers with the next item of ``outcomes``: a status code or an exception."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _Response(outcome)
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()  # the probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot() == {'state': 'closed', 'failures': 0, 'retry_in': 0.0}
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()['retry_in'] == 10
+
+
+def test_open_circuit_short_circuits_without_network(clock):
+    client = ApiClient('http://api.test', failure_threshold=2, cooldown=30)
+    client.session = _FakeSession([503, requests.exceptions.ConnectionError(), 200])
+    assert client.get('flights').status_code == 503
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get('flights')
+
+    with pytest.raises(CircuitOpenError) as raised:
+        client.get('flights?day=1')
+    assert raised.value.endpoint == 'flights' and raised.value.retry_in == 30
+    assert client.session.calls == 2
+    # Other endpoints keep their own breaker; 4xx counts as the server being up
+    client.session.outcomes = [404]
+    assert client.get('scanner').status_code == 404
+
+    metrics = client.metrics()
+    assert metrics['flights']['count'] == 2
+    assert metrics['flights']['errors'] == 2
+    assert metrics['flights']['short_circuited'] == 1
+    assert metrics['flights']['breaker']['state'] == 'open'
+    assert metrics['scanner']['breaker']['state'] == 'closed'
+
+    clock.now += 30
+    client.session.outcomes = [200]
+    assert client.get('flights').status_code == 200
+    assert client.metrics()['flights']['breaker']['state'] == 'closed'
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from app_parts.catalog import CatalogIndex
+
+BASE = "https://jsonplaceholder.typicode.com/posts"
+
+
+def _index(*ids):
+    return CatalogIndex(pd.DataFrame({'name': [f"Item {i}" for i in ids], 'url': [f"{BASE}/{i}" for i in ids]}))
+
+
+def test_contained_url_needs_a_boundary():
+    row, item_id = _index(2).resolve(f"{BASE}/25")
+    assert row is None and item_id is None
+
+
+def test_contained_url_followed_by_query_or_fragment():
+    index = _index(2)
+    for payload in (f"{BASE}/2?lot=7", f"{BASE}/2#x", f"{BASE}/2/", f"lot:{BASE}/2"):
+        row, item_id = index.resolve(payload)
+        assert row['url'] == f"{BASE}/2" and item_id == '2'
+
+
+def test_longer_id_still_resolves_to_its_own_row():
+    row, item_id = _index(2, 25).resolve(f"{BASE}/25?x=1")
+    assert row['url'] == f"{BASE}/25" and item_id == '25'
@@ -0,0 +1,31 @@
+import csv
+import io
+
+import pytest
+
+from app_parts.history_export import export_history
+from app_parts.scan_store import ScanEventStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScanEventStore(str(tmp_path / 'scans.db'))
+    for i in range(7):
+        store.record({'item_id': i, 'item_name': f"Item {i}", 'scanned_by': 'ana'}, 'inventory',
+                     station='a', ts=1_700_000_000 + i)
+    return store
+
+
+def test_csv_export_is_newest_first(store):
+    with export_history(store, {'page': 'inventory'}, 'CSV', chunk_size=3) as f:
+        rows = list(csv.reader(io.TextIOWrapper(f, encoding='utf-8')))
+    assert rows[0] == ['Producto', 'ID', 'Fecha', 'Usuario', 'Estación']
+    assert [r[1] for r in rows[1:]] == ['6', '5', '4', '3', '2', '1', '0']
+
+
+def test_parquet_export_round_trips(store):
+    pq = pytest.importorskip('pyarrow.parquet')
+    with export_history(store, {'page': 'inventory'}, 'Parquet', chunk_size=3) as f:
+        table = pq.read_table(io.BytesIO(f.read()))
+    assert table.num_rows == 7
+    assert table.column('ID').to_pylist()[0] == '6'
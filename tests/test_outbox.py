@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from app_parts.outbox import ScanOutbox
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ''
+
+
+class _FakeClient:
+    """Answers each POST with ``status(url, json)`` and records the calls."""
+
+    def __init__(self, status=lambda url, json: 200):
+        self.status = status
+        self.calls = []
+
+    def post(self, url, json=None, headers=None):
+        self.calls.append((url, json, (headers or {}).get('Authorization')))
+        return _Response(self.status(url, json))
+
+
+@pytest.fixture
+def make_outbox(tmp_path):
+    outboxes = []
+
+    def make(client, path=None):
+        outbox = ScanOutbox(str(path or tmp_path / 'outbox.db'), client=client)
+        outboxes.append(outbox)
+        return outbox
+
+    yield make
+    for outbox in outboxes:
+        outbox.close()
+
+
+def _flush(outbox):
+    """Deliver every pending row as if all were due."""
+    outbox._send(outbox._due_rows(time.time() + 1e6))
+
+
+def _rows(outbox):
+    return outbox._conn.execute("SELECT id, status, attempts, last_error, token, next_attempt_at FROM outbox").fetchall()
+
+
+def test_rows_survive_reopen(make_outbox, tmp_path):
+    path = tmp_path / 'outbox.db'
+    first = make_outbox(_FakeClient(), path)
+    first.enqueue('/scans', {'item_name': 'Ron'})
+    first.close()
+
+    reopened = make_outbox(_FakeClient(), path)
+    assert reopened.stats()['pending'] == 1
+    _flush(reopened)
+    assert reopened.client.calls[0][:2] == ('/scans', {'item_name': 'Ron'})
+
+
+def test_success_deletes_rows(make_outbox):
+    outbox = make_outbox(_FakeClient())
+    for i in range(3):
+        outbox.enqueue('/scans', {'item_name': f"Item {i}"})
+    _flush(outbox)
+    assert [c[0] for c in outbox.client.calls] == ['/scans/batch']
+    assert _rows(outbox) == []
+
+
+def test_non_retryable_4xx_is_rejected(make_outbox):
+    outbox = make_outbox(_FakeClient(lambda url, json: 422))
+    outbox.enqueue('/scans', {'item_name': 'Ron'})
+    _flush(outbox)
+    [(_, status, attempts, error, _, _)] = _rows(outbox)
+    assert (status, attempts, error) == ('rejected', 1, 'HTTP 422')
+    assert outbox.stats()['rejected'] == 1
+
+
+@pytest.mark.parametrize('code', [401, 403, 408, 429, 503])
+def test_retryable_status_backs_off(make_outbox, code):
+    outbox = make_outbox(_FakeClient(lambda url, json: code))
+    outbox.enqueue('/scans', {'item_name': 'Ron'})
+    for attempt in (1, 2):
+        before = time.time()
+        _flush(outbox)
+        [(_, status, attempts, error, _, next_at)] = _rows(outbox)
+        assert (status, attempts, error) == ('pending', attempt, f"HTTP {code}")
+        # 2 ** attempts seconds, +-20% jitter
+        assert before + 0.8 * 2 ** attempt <= next_at <= time.time() + 1.2 * 2 ** attempt
+
+
+@pytest.mark.parametrize('code', [404, 405])
+def test_missing_batch_route_falls_back_to_single_posts(make_outbox, code):
+    outbox = make_outbox(_FakeClient(lambda url, json: code if url.endswith('/batch') else 201))
+    outbox.enqueue('/scans', {'item_name': 'Ron'})
+    outbox.enqueue('/scans', {'item_name': 'Gin'})
+    _flush(outbox)
+    assert [c[0] for c in outbox.client.calls] == ['/scans/batch', '/scans', '/scans']
+    assert _rows(outbox) == []
+
+    # The endpoint is remembered: no more batch attempts
+    outbox.enqueue('/scans', {'item_name': 'Vodka'})
+    outbox.enqueue('/scans', {'item_name': 'Pisco'})
+    _flush(outbox)
+    assert [c[0] for c in outbox.client.calls[3:]] == ['/scans', '/scans']
+
+
+def test_auth_failures_resent_with_refreshed_token(make_outbox):
+    client = _FakeClient()
+    client.status = lambda url, json: 401 if client.calls[-1][2] == 'Bearer old' else 200
+    outbox = make_outbox(client)
+    outbox.enqueue('/scans', {'item_name': 'Ron'}, token='old')
+    _flush(outbox)
+    [(_, status, _, error, token, next_at)] = _rows(outbox)
+    assert (status, error, token) == ('pending', 'HTTP 401', 'old')
+    assert next_at > time.time()
+
+    # A scan with a fresh token re-queues the held one under that token, due now
+    outbox.enqueue('/scans', {'item_name': 'Gin'}, token='new')
+    assert {row[4] for row in _rows(outbox)} == {'new'}
+    outbox._send(outbox._due_rows(time.time()))
+    assert client.calls[-1][2] == 'Bearer new'
+    assert _rows(outbox) == []
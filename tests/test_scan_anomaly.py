@@ -0,0 +1,73 @@
+import math
+import time
+
+from app_parts.scan_anomaly import ScanAnomaly, ScanAnomalyDetector, _poisson_sf, describe_anomaly
+from app_parts.scan_store import ScanEventStore
+
+
+def _scan(store, user, ts):
+    store.record({'item_id': 7, 'item_name': 'Ron', 'scanned_by': user}, 'alcohol', station='bar', ts=ts)
+
+
+def test_empty_first_sync_does_not_replay_old_events(tmp_path):
+    store = ScanEventStore(str(tmp_path / 'scans.db'))
+    detector = ScanAnomalyDetector()
+    old = time.time() - 10 * detector.long_window
+    for i in range(100):
+        _scan(store, 'ana', old + i)
+
+    assert detector.sync(store) == []
+    assert detector.observed == 0
+
+    _scan(store, 'ana', time.time())
+    detector.sync(store)
+    assert detector.observed == 1
+    detector.sync(store)
+    assert detector.observed == 1
+
+
+def test_cold_start_burst_from_new_user_is_flagged():
+    detector = ScanAnomalyDetector()
+    start = 1_700_000_000.0
+    # Quiet history for the station and item, so only the user is new
+    for i in range(200):
+        detector.observe(start + 60 * i, 'Ron', f"crew{i % 10}", 'bar')
+    burst = start + 200 * 60
+    found = []
+    for k in range(45):
+        found += detector.observe(burst + 4 * k, 'Ron', 'nuevo', 'bar')
+
+    users = [a for a in found if a.kind == 'user']
+    assert [a.key for a in users] == ['nuevo']
+    assert math.isnan(users[0].expected)
+    assert "sin historial previo" in describe_anomaly(users[0])
+
+
+def test_description_includes_date():
+    ts = time.mktime((2026, 3, 14, 9, 30, 0, 0, 0, -1))
+    text = describe_anomaly(ScanAnomaly('user', 'ana', ts, 9, 1.2, 1e-9))
+    assert "lo normal: 1.2" in text
+    assert "2026-03-14 09:30" in text
+
+
+def test_poisson_tail_with_large_mean():
+    # exp(-lam) underflows above lam ~ 745
+    assert _poisson_sf(3000, 800) < 1e-100
+    assert 1e-4 < _poisson_sf(900, 800) < 1e-3
+    assert 0.45 < _poisson_sf(800, 800) < 0.55
+    assert _poisson_sf(700, 800) > 0.99
+    # Small means agree with the direct sum
+    direct = 1 - sum(math.exp(-2.0) * 2.0 ** i / math.factorial(i) for i in range(10))
+    assert math.isclose(_poisson_sf(10, 2.0), direct, rel_tol=1e-6)
+
+
+def test_burst_on_high_volume_item_is_flagged():
+    detector = ScanAnomalyDetector()
+    start = 1_700_000_000.0
+    for i in range(3 * 3600):  # 3 scans/s for an hour: ~900 expected per short window
+        assert detector.observe(start + i / 3, 'Ron') == []
+    found = []
+    for i in range(30 * 120):  # 30 scans/s for two minutes
+        found += detector.observe(start + 3600 + i / 30, 'Ron')
+    assert [a.key for a in found] == ['Ron']
+    assert found[0].expected > 745
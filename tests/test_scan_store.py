@@ -0,0 +1,46 @@
+import random
+import time
+
+import pytest
+
+from app_parts.scan_store import ScanEventStore
+
+
+def _result(item_id, user='ana'):
+    return {'item_id': item_id, 'item_name': f"Item {item_id}", 'scanned_by': user}
+
+
+def test_summary_follows_inserts_from_other_connections(tmp_path):
+    path = str(tmp_path / 'scans.db')
+    store = ScanEventStore(path)
+    store.record(_result(1), 'inventory', station='a')
+    assert store.summary(page='inventory') == {'total': 1, 'successful': 1, 'unique_items': 1}
+    assert store.stations('inventory') == ['a']
+
+    # Another process sharing the file
+    ScanEventStore(path).record(_result(2), 'inventory', station='b')
+    assert store.summary(page='inventory') == {'total': 2, 'successful': 2, 'unique_items': 2}
+    assert store.stations('inventory') == ['a', 'b']
+    assert store.summary(page='alcohol')['total'] == 0
+
+
+@pytest.mark.parametrize('tz', ['UTC', 'Europe/Madrid', 'America/Santiago', 'Asia/Kolkata'])
+def test_backfilled_rollups_match_live_ones(tmp_path, monkeypatch, tz):
+    monkeypatch.setenv('TZ', tz)
+    time.tzset()
+    try:
+        path = str(tmp_path / 'scans.db')
+        store = ScanEventStore(path)
+        rng = random.Random(1)
+        for i in range(2000):
+            # A year of scans, crossing both DST changes
+            store.record(_result(i % 5), 'alcohol', station='ab'[i % 2], ts=1_700_000_000 + rng.uniform(0, 3.2e7))
+        live = sorted(map(tuple, store._conn.execute("SELECT * FROM scan_rollups")))
+        store._conn.execute("DELETE FROM scan_rollups")
+        store._conn.commit()
+
+        backfilled = sorted(map(tuple, ScanEventStore(path)._conn.execute("SELECT * FROM scan_rollups")))
+        assert backfilled == live
+    finally:
+        monkeypatch.undo()
+        time.tzset()
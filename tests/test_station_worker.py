@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from app_parts import station_worker
+
+
+class _FakeGrabber:
+    """Delivers ``frames`` frames (endless when None), then fails."""
+
+    def __init__(self, source, frames=None, **kwargs):
+        self.frames = frames
+        self.failed = False
+
+    def start(self):
+        return True
+
+    def read(self, timeout=1.0):
+        time.sleep(0.01)
+        if self.frames is not None:
+            if self.frames == 0:
+                self.failed = True
+                return False, None
+            self.frames -= 1
+        return True, object()
+
+    def release(self):
+        pass
+
+
+class _NoDecoder:
+    def decode(self, frame):
+        return []
+
+
+@pytest.fixture
+def make_worker(monkeypatch):
+    workers = []
+
+    def make(frames=None, active_window=0.2):
+        monkeypatch.setattr(station_worker, 'FrameGrabber', lambda source, **kw: _FakeGrabber(source, frames))
+        monkeypatch.setattr(station_worker, 'select_decoder', _NoDecoder)
+        worker = station_worker.StationWorker('test', active_window=active_window)
+        workers.append(worker)
+        assert worker.ensure_started()
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.stop()
+
+
+def test_paused_worker_drops_stale_result(make_worker):
+    worker = make_worker()
+    first = worker.next_result(0, timeout=1.0)
+    assert first is not None
+
+    time.sleep(0.5)  # nobody polls: decoding pauses
+    assert worker._latest is None
+    resumed = worker.next_result(0, timeout=1.0)
+    assert resumed is not None and resumed[0] > first[0]
+
+
+def test_grabber_failure_stops_worker(make_worker):
+    worker = make_worker(frames=3)
+    deadline = time.monotonic() + 2.0
+    while worker.is_running and time.monotonic() < deadline:
+        worker.next_result(worker._seq, timeout=0.1)
+    assert not worker.is_running
+
+
+@pytest.fixture
+def shared_workers(monkeypatch):
+    monkeypatch.setattr(station_worker, 'FrameGrabber', lambda source, **kw: _FakeGrabber(source))
+    monkeypatch.setattr(station_worker, 'select_decoder', _NoDecoder)
+    yield
+    with station_worker._workers_lock:
+        workers = list(station_worker._workers.values())
+        station_worker._workers.clear()
+    for worker in workers:
+        worker.stop()
+
+
+def test_decoder_is_built_outside_the_registry_lock(shared_workers, monkeypatch):
+    def decoder():
+        assert not station_worker._workers_lock.locked()
+        return _NoDecoder()
+
+    monkeypatch.setattr(station_worker, 'select_decoder', decoder)
+    worker = station_worker.get_station_worker('cam-a')
+    assert station_worker.get_station_worker('cam-a') is worker
+
+
+def test_release_keeps_camera_for_other_sessions(shared_workers):
+    worker = station_worker.get_station_worker('cam-b')
+    station_worker.release_station_worker('cam-b')
+    # Marked idle: the reaper takes it once the grace period passes unpolled
+    idle_for = time.monotonic() - worker.last_used
+    assert idle_for + station_worker.RELEASE_GRACE >= station_worker._idle_timeout()
+    assert station_worker._workers['cam-b'] is worker
+
+    # Another kiosk session still scanning keeps the same worker
+    assert station_worker.get_station_worker('cam-b') is worker
+    assert time.monotonic() - worker.last_used < 1.0
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from app_parts import swr_cache
+from app_parts.swr_cache import StaleWhileRevalidateCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(swr_cache.time, 'monotonic', clock)
+    return clock
+
+
+class _Loader:
+    """Returns 1, 2, 3... (or raises ``fail``); calls wait while ``release`` is cleared."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = None
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise self.fail
+        return self.calls
+
+
+def _settle(cache, key):
+    """Wait for a background refresh of ``key`` to be stored."""
+    deadline = time.time() + 5
+    while cache._entries[key].refreshing and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def test_fresh_hit_does_not_reload(clock):
+    cache = StaleWhileRevalidateCache(ttl=60)
+    loader = _Loader()
+    assert cache.get('flights', loader) == 1
+    clock.now += 59
+    assert cache.get('flights', loader) == 1
+    assert loader.calls == 1
+    assert cache.status('flights') == (59, None)
+
+
+def test_stale_value_served_while_one_refresh_runs(clock):
+    cache = StaleWhileRevalidateCache(ttl=60)
+    loader = _Loader()
+    cache.get('flights', loader)
+
+    loader.release.clear()
+    loader.started.clear()
+    clock.now += 61
+    assert cache.get('flights', loader) == 1  # stale, refresh started in background
+    assert loader.started.wait(5)
+    for _ in range(5):
+        assert cache.get('flights', loader) == 1  # no duplicate refresh
+    assert loader.calls == 2
+
+    loader.release.set()
+    _settle(cache, 'flights')
+    assert cache.get('flights', loader) == 2
+    assert loader.calls == 2
+
+
+def test_failed_refresh_is_not_retried_within_error_ttl(clock):
+    cache = StaleWhileRevalidateCache(ttl=60, error_ttl=30)
+    loader = _Loader()
+    cache.get('flights', loader)
+
+    loader.fail = RuntimeError("HTTP 401")
+    clock.now += 61
+    assert cache.get('flights', loader) == 1
+    _settle(cache, 'flights')
+    assert cache.status('flights')[1] is loader.fail
+
+    clock.now += 29
+    assert cache.get('flights', loader) == 1  # last good value, no retry yet
+    assert loader.calls == 2
+
+    loader.fail = None
+    clock.now += 1
+    cache.get('flights', loader)
+    _settle(cache, 'flights')
+    assert loader.calls == 3
+    assert cache.get('flights', loader) == 3
+
+
+def test_first_load_failure_returns_default():
+    cache = StaleWhileRevalidateCache()
+    loader = _Loader()
+    loader.fail = RuntimeError("timeout")
+    assert cache.get('flights', loader, default=[]) == []
+    assert cache.status('flights') == (None, loader.fail)